@@ -0,0 +1,88 @@
+"""
+Benchmarks for combine_markdown.
+
+Measures the parallel read-ahead stage of combine_markdown_files on many
+small files. Local disks answer open/read calls in microseconds, so a
+per-open delay can be injected with --latency-ms to model the round trips
+of a network filesystem such as NFS.
+
+Usage:
+    python benchmarks/bench_combine_markdown.py --files 2000 --latency-ms 2
+"""
+
+import argparse
+import builtins
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import combine_markdown
+
+
+def make_tree(directory, num_files, file_size):
+    """Create num_files markdown files of roughly file_size bytes each."""
+    files = []
+    line = "Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n"
+    body = (line * (file_size // len(line) + 1))[:file_size]
+    for i in range(num_files):
+        path = os.path.join(directory, f"doc{i:06d}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# Document {i}\n\n{body}")
+        files.append(path)
+    return files
+
+
+def slow_open(latency):
+    """Return an open() replacement that sleeps before every call."""
+    def _open(*args, **kwargs):
+        time.sleep(latency)
+        return builtins.open(*args, **kwargs)
+    return _open
+
+
+def time_combine(files, output_file, workers):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        combine_markdown.combine_markdown_files(files, output_file, workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark combine_markdown read-ahead.")
+    parser.add_argument("--files", type=int, default=1000, help="Number of input files")
+    parser.add_argument("--size", type=int, default=2048, help="Approximate bytes per file")
+    parser.add_argument("--latency-ms", type=float, default=1.0,
+                        help="Simulated latency per open() in milliseconds, 0 for none")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 4, 8, 16],
+                        help="Worker counts to compare")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        files = make_tree(directory, args.files, args.size)
+        output_file = os.path.join(directory, 'combined.md')
+        if args.latency_ms:
+            # Shadow the builtin inside the module only
+            combine_markdown.open = slow_open(args.latency_ms / 1000)
+
+        print(f"{args.files} files x {args.size} bytes, {args.latency_ms} ms simulated latency")
+        print(f"{'workers':>8} {'seconds':>10} {'files/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            elapsed = time_combine(files, output_file, workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.3f} {args.files / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+    finally:
+        if hasattr(combine_markdown, 'open'):
+            del combine_markdown.open
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
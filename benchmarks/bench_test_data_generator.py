@@ -0,0 +1,382 @@
+"""
+Benchmarks for test_data_generator.
+
+backends: generates the README example schema with the pure-Python and the
+vectorized NumPy backends and reports rows per second for each.
+
+shards: writes the same sharded CSV with an increasing number of worker
+processes and reports rows per second and scaling efficiency.
+
+cells: generates one single-column schema per data type, with and without
+NULLs, on the pure-Python backend and reports the cost per cell.
+
+distributions: generates one column per distribution (uniform, normal,
+exponential, zipf over a million keys, weighted over a thousand choices) and
+reports rows per second relative to uniform.
+
+unique: generates unique integer and email columns and reports rows per
+second against the same columns without unique, plus the memory the
+dedup structure holds compared with a Python set of the same values.
+
+references: generates a child table whose related_to column samples a
+parent key array, at growing row counts, to show the cost stays linear.
+
+sqlite: loads the same generated rows into SQLite directly with
+write_sqlite, and by writing a CSV with write_csv and importing it with
+csv.reader and executemany, and reports rows per second for each path.
+
+stream: streams rows at increasing target rates to a local TCP server that
+discards them and reports the achieved rate and the worst lag behind
+schedule; once the target exceeds what generation can keep up with, the
+achieved rate levels off and the lag grows.
+
+counter: compares sequential generation with counter-based generation,
+where each cell is a pure function of (seed, column, row), and reports how
+long it takes to fetch single rows at random positions of a virtual
+billion-row dataset.
+
+formats: writes the same generated data as CSV, per-column NPY, Arrow IPC
+(plain and dictionary-encoded) and Parquet and reports write time and file
+size for each.
+
+Usage:
+    python benchmarks/bench_test_data_generator.py backends --rows 1000000
+    python benchmarks/bench_test_data_generator.py shards --rows 2000000 --processes 1 2 4 8
+    python benchmarks/bench_test_data_generator.py formats --rows 1000000
+    python benchmarks/bench_test_data_generator.py cells --rows 500000
+    python benchmarks/bench_test_data_generator.py references --rows 1000000 --unique
+    python benchmarks/bench_test_data_generator.py unique --rows 1000000
+    python benchmarks/bench_test_data_generator.py distributions --backend numpy
+    python benchmarks/bench_test_data_generator.py sqlite --rows 1000000
+    python benchmarks/bench_test_data_generator.py stream --rates 10000 100000 1000000
+    python benchmarks/bench_test_data_generator.py counter --rows 500000
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.test_data_generator import ColumnConfig, SocketSink, TestDataGenerator, UniqueFilter
+
+COLUMNS = [
+    ColumnConfig(name="id", data_type="integer", min_value=1, max_value=1000),
+    ColumnConfig(name="name", data_type="string"),
+    ColumnConfig(name="email", data_type="email"),
+    ColumnConfig(name="registration_date", data_type="date"),
+    ColumnConfig(name="score", data_type="float", min_value=0.0, max_value=100.0),
+    ColumnConfig(name="phone", data_type="phone", null_probability=0.1)
+]
+
+
+def rows_per_second(make_generator, num_rows):
+    generator = make_generator()
+    start = time.perf_counter()
+    generator.generate_data(num_rows)
+    return num_rows / (time.perf_counter() - start)
+
+
+def bench_backends(args):
+    print(f"{args.rows} rows x {len(COLUMNS)} columns")
+    print(f"{'backend':<10} {'rows/s':>12} {'speedup':>8}")
+    baseline = None
+    for backend in ('python', 'numpy'):
+        rate = rows_per_second(lambda: TestDataGenerator(COLUMNS, seed=0, backend=backend), args.rows)
+        baseline = baseline or rate
+        print(f"{backend:<10} {rate:>12,.0f} {rate / baseline:>7.1f}x")
+
+
+def bench_shards(args):
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'data.csv')
+        shards = max(args.processes)
+        print(f"{args.rows} rows in {shards} shards, backend {args.backend}")
+        print(f"{'processes':>9} {'rows/s':>12} {'speedup':>8} {'efficiency':>10}")
+        baseline = None
+        for processes in args.processes:
+            generator = TestDataGenerator(COLUMNS, seed=0, backend=args.backend)
+            start = time.perf_counter()
+            generator.write_csv_sharded(path, args.rows, shards, processes=processes)
+            rate = args.rows / (time.perf_counter() - start)
+            baseline = baseline or rate / processes
+            speedup = rate / baseline
+            print(f"{processes:>9} {rate:>12,.0f} {speedup:>7.1f}x {speedup / processes:>9.0%}")
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_cells(args):
+    print(f"{args.rows} cells per column, backend python")
+    print(f"{'data_type':<10} {'ns/cell':>8} {'ns/cell (10% NULL)':>19}")
+    for data_type in ('string', 'integer', 'float', 'date', 'email', 'phone'):
+        costs = []
+        for null_probability in (0.0, 0.1):
+            column = ColumnConfig(name="c", data_type=data_type, null_probability=null_probability)
+            generator = TestDataGenerator([column], seed=0)
+            start = time.perf_counter()
+            generator.generate_data(args.rows)
+            costs.append((time.perf_counter() - start) / args.rows * 1e9)
+        print(f"{data_type:<10} {costs[0]:>8,.0f} {costs[1]:>19,.0f}")
+
+
+def bench_references(args):
+    parent_ids = list(range(args.rows * 4))
+    columns = [
+        ColumnConfig(name="order_id", data_type="integer"),
+        ColumnConfig(name="customer_id", data_type="integer",
+                     related_to="customers.id", unique=args.unique),
+    ]
+    print(f"{len(parent_ids)} parent keys, unique={args.unique}, backend {args.backend}")
+    print(f"{'rows':>10} {'seconds':>8} {'rows/s':>12}")
+    for rows in (args.rows // 4, args.rows // 2, args.rows):
+        generator = TestDataGenerator(columns, seed=0, backend=args.backend,
+                                      references={"customers.id": parent_ids})
+        start = time.perf_counter()
+        generator.generate_data(rows)
+        elapsed = time.perf_counter() - start
+        print(f"{rows:>10} {elapsed:>8.2f} {rows / elapsed:>12,.0f}")
+
+
+def bench_distributions(args):
+    cases = [
+        ("uniform", ColumnConfig(name="c", data_type="integer", max_value=10 ** 6)),
+        ("normal", ColumnConfig(name="c", data_type="float", max_value=10 ** 6,
+                                distribution="normal")),
+        ("exponential", ColumnConfig(name="c", data_type="float", max_value=10 ** 6,
+                                     distribution="exponential")),
+        ("zipf", ColumnConfig(name="c", data_type="integer", max_value=10 ** 6,
+                              distribution="zipf", exponent=1.1)),
+        ("weighted", ColumnConfig(name="c", data_type="string", distribution="weighted",
+                                  choices=[f"sku{i}" for i in range(1000)],
+                                  weights=[1 / (i + 1) for i in range(1000)])),
+    ]
+    print(f"{args.rows} rows, backend {args.backend}")
+    print(f"{'distribution':<12} {'rows/s':>12} {'vs uniform':>10}")
+    baseline = None
+    for name, column in cases:
+        rate = rows_per_second(lambda: TestDataGenerator([column], seed=0, backend=args.backend),
+                               args.rows)
+        baseline = baseline or rate
+        print(f"{name:<12} {rate:>12,.0f} {rate / baseline:>9.2f}x")
+
+
+def bench_unique(args):
+    print(f"{args.rows} rows, backend {args.backend}")
+    print(f"{'data_type':<10} {'rows/s':>12} {'unique rows/s':>14} {'dedup MiB':>10} {'set MiB':>8}")
+    for data_type in ('integer', 'email'):
+        rates = []
+        for unique in (False, True):
+            column = ColumnConfig(name="c", data_type=data_type, max_value=10 ** 12, unique=unique)
+            generator = TestDataGenerator([column], seed=0, backend=args.backend)
+            start = time.perf_counter()
+            generator.generate_data(args.rows)
+            rates.append(args.rows / (time.perf_counter() - start))
+        values = generator.data["c"]
+        dedup = generator.uniques["c"]
+        dedup_bytes = dedup.nbytes if isinstance(dedup, UniqueFilter) else sys.getsizeof(dedup)
+        seen = set(values)
+        set_bytes = sys.getsizeof(seen) + sum(sys.getsizeof(v) for v in values)
+        print(f"{data_type:<10} {rates[0]:>12,.0f} {rates[1]:>14,.0f} "
+              f"{dedup_bytes / 2 ** 20:>10.2f} {set_bytes / 2 ** 20:>8.1f}")
+
+
+def import_csv(csv_path, db_path, table):
+    """The CSV-then-import path: default connection settings, one transaction."""
+    connection = sqlite3.connect(db_path)
+    try:
+        with open(csv_path, newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader)
+            connection.execute(f"CREATE TABLE {table} ({', '.join(header)})")
+            connection.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(header))})",
+                                   reader)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def bench_sqlite(args):
+    directory = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(directory, 'data.csv')
+        paths = [os.path.join(directory, name) for name in ('direct.db', 'imported.db')]
+
+        def direct():
+            generator = TestDataGenerator(COLUMNS, seed=0, backend=args.backend)
+            generator.write_sqlite(paths[0], args.rows, indexes=args.indexes)
+
+        def csv_then_import():
+            generator = TestDataGenerator(COLUMNS, seed=0, backend=args.backend)
+            generator.write_csv(csv_path, args.rows)
+            import_csv(csv_path, paths[1], 'data')
+            connection = sqlite3.connect(paths[1])
+            for name in args.indexes:
+                connection.execute(f"CREATE INDEX data_{name}_idx ON data ({name})")
+            connection.close()
+
+        print(f"{args.rows} rows x {len(COLUMNS)} columns, backend {args.backend}, "
+              f"indexes {args.indexes or 'none'}")
+        print(f"{'path':<16} {'seconds':>8} {'rows/s':>12}")
+        for name, load in (('csv then import', csv_then_import), ('write_sqlite', direct)):
+            start = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} {elapsed:>8.2f} {args.rows / elapsed:>12,.0f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+async def stream_to_server(rate, seconds, backend):
+    drained = asyncio.Event()
+
+    async def discard(reader, writer):
+        while await reader.read(1 << 16):
+            pass
+        writer.close()
+        drained.set()
+
+    server = await asyncio.start_server(discard, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    generator = TestDataGenerator(COLUMNS, seed=0, backend=backend)
+    stats = await generator.stream(rate, num_rows=int(rate * seconds)).pipe(SocketSink('127.0.0.1', port))
+    await drained.wait()
+    server.close()
+    await server.wait_closed()
+    return stats
+
+
+def bench_stream(args):
+    print(f"{args.seconds}s per rate, backend {args.backend}, TCP sink")
+    print(f"{'target/s':>10} {'achieved/s':>12} {'max lag s':>10}")
+    for rate in args.rates:
+        stats = asyncio.run(stream_to_server(rate, args.seconds, args.backend))
+        print(f"{rate:>10,} {stats.throughput:>12,.0f} {stats.max_lag:>10.3f}")
+
+
+def bench_counter(args):
+    print(f"{args.rows} rows x {len(COLUMNS)} columns, backend python")
+    print(f"{'mode':<14} {'rows/s':>12}")
+    for name, counter_based in (('sequential', False), ('counter-based', True)):
+        rate = rows_per_second(lambda: TestDataGenerator(COLUMNS, seed=0, counter_based=counter_based),
+                               args.rows)
+        print(f"{name:<14} {rate:>12,.0f}")
+
+    dataset = TestDataGenerator(COLUMNS, seed=0, counter_based=True).virtual(10 ** 9)
+    picks = random.Random(0).sample(range(len(dataset)), args.lookups)
+    start = time.perf_counter()
+    for index in picks:
+        dataset[index]
+    elapsed = time.perf_counter() - start
+    print(f"{args.lookups} random rows of {len(dataset):,}: {elapsed / args.lookups * 1e6:,.1f} us each")
+
+
+def directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_formats(args):
+    generator = TestDataGenerator(COLUMNS, seed=0, backend=args.backend)
+    generator.generate_data(args.rows)
+    directory = tempfile.mkdtemp()
+    try:
+        npy_dir = os.path.join(directory, 'npy')
+        os.mkdir(npy_dir)
+        writers = [
+            ('csv', os.path.join(directory, 'data.csv'), generator.save_to_csv),
+            ('npy', npy_dir, generator.save_to_npy),
+            ('arrow', os.path.join(directory, 'data.arrow'), generator.save_to_arrow),
+            ('arrow-dict', os.path.join(directory, 'dict.arrow'),
+             lambda path: generator.save_to_arrow(path, dictionary=True)),
+            ('parquet', os.path.join(directory, 'data.parquet'), generator.save_to_parquet),
+        ]
+        print(f"{args.rows} rows x {len(COLUMNS)} columns, backend {args.backend}")
+        print(f"{'format':<10} {'seconds':>8} {'rows/s':>12} {'MiB':>8}")
+        for name, path, write in writers:
+            start = time.perf_counter()
+            try:
+                write(path)
+            except ImportError as e:
+                print(f"{name:<10} skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            size = directory_size(path) / (1024 * 1024)
+            print(f"{name:<10} {elapsed:>8.2f} {args.rows / elapsed:>12,.0f} {size:>8.1f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark test_data_generator.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    backends = subparsers.add_parser("backends", help="Pure-Python vs NumPy generation")
+    backends.add_argument("--rows", type=int, default=200000, help="Number of rows")
+    backends.set_defaults(func=bench_backends)
+
+    shards = subparsers.add_parser("shards", help="Multi-process sharded CSV generation")
+    shards.add_argument("--rows", type=int, default=400000, help="Number of rows")
+    shards.add_argument("--processes", type=int, nargs='+', default=[1, 2, 4],
+                        help="Process counts to compare; the largest is also the shard count")
+    shards.add_argument("--backend", default="python", help="Generation backend")
+    shards.set_defaults(func=bench_shards)
+
+    cells = subparsers.add_parser("cells", help="Per-cell generation cost by data type")
+    cells.add_argument("--rows", type=int, default=200000, help="Number of cells per column")
+    cells.set_defaults(func=bench_cells)
+
+    references = subparsers.add_parser("references", help="related_to foreign-key sampling")
+    references.add_argument("--rows", type=int, default=400000, help="Largest number of child rows")
+    references.add_argument("--unique", action="store_true", help="Draw each parent key at most once")
+    references.add_argument("--backend", default="python", help="Generation backend")
+    references.set_defaults(func=bench_references)
+
+    distributions = subparsers.add_parser("distributions", help="Skewed vs uniform sampling cost")
+    distributions.add_argument("--rows", type=int, default=200000, help="Number of rows")
+    distributions.add_argument("--backend", default="python", help="Generation backend")
+    distributions.set_defaults(func=bench_distributions)
+
+    unique = subparsers.add_parser("unique", help="unique=True throughput and memory")
+    unique.add_argument("--rows", type=int, default=200000, help="Number of rows")
+    unique.add_argument("--backend", default="python", help="Generation backend")
+    unique.set_defaults(func=bench_unique)
+
+    sqlite = subparsers.add_parser("sqlite", help="Direct SQLite load vs CSV then import")
+    sqlite.add_argument("--rows", type=int, default=200000, help="Number of rows")
+    sqlite.add_argument("--backend", default="python", help="Generation backend")
+    sqlite.add_argument("--indexes", nargs='*', default=["id"], help="Columns to index after loading")
+    sqlite.set_defaults(func=bench_sqlite)
+
+    stream = subparsers.add_parser("stream", help="Rate-controlled streaming to a TCP sink")
+    stream.add_argument("--rates", type=int, nargs='+', default=[10000, 50000, 200000],
+                        help="Target rows per second to try")
+    stream.add_argument("--seconds", type=float, default=2.0, help="Duration of each run")
+    stream.add_argument("--backend", default="python", help="Generation backend")
+    stream.set_defaults(func=bench_stream)
+
+    counter = subparsers.add_parser("counter", help="Counter-based vs sequential generation")
+    counter.add_argument("--rows", type=int, default=100000, help="Number of rows")
+    counter.add_argument("--lookups", type=int, default=10000, help="Random rows to fetch")
+    counter.set_defaults(func=bench_counter)
+
+    formats = subparsers.add_parser("formats", help="CSV vs columnar binary output")
+    formats.add_argument("--rows", type=int, default=200000, help="Number of rows")
+    formats.add_argument("--backend", default="python", help="Generation backend")
+    formats.set_defaults(func=bench_formats)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Benchmarks for tree_writer.
+
+formats: times every single-format save_to_file call on a synthetic tree
+and compares their sum and maximum with the single-pass save_all_formats.
+
+pdf: renders a listing of --lines lines with save_to_pdf and reports
+throughput in lines per second and the peak traced memory.
+
+startup: measures the cold import of tree_writer with python -X importtime
+in fresh interpreters, each paired with an import of just the stdlib
+modules tree_writer needs (REFERENCE_MODULES). It exits with status 1
+if any format backend (reportlab, yaml, jinja2) or any other module
+beyond the reference is imported, or if the median ratio of the paired
+timings exceeds --max-ratio. Both sides of a pair see the same machine
+load, so the ratio holds steady where absolute milliseconds do not.
+
+cache: builds a real directory tree and compares a full walk with cold
+and warm runs of the snapshot-cached walk.
+
+memory: compares the memory held by the list-of-dicts structure with the
+array-backed DirectoryTable for a synthetic tree. Names are generated
+with the kind of repetition real repositories have (README.md,
+__init__.py, numbered modules) so the effect of interning shows up.
+
+Usage:
+    python benchmarks/bench_tree_writer.py formats --dirs 5000
+    python benchmarks/bench_tree_writer.py pdf --lines 1000000
+    python benchmarks/bench_tree_writer.py startup --max-ratio 1.5
+    python benchmarks/bench_tree_writer.py cache --dirs 5000
+    python benchmarks/bench_tree_writer.py memory --dirs 50000 --files 20
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tree_writer import (
+    BACKEND_MODULES, DirectoryTable, generate_directory_structure,
+    iter_directory_structure_cached, save_all_formats, save_to_file, save_to_pdf)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The stdlib modules tree_writer imports at module level; importing them
+# alone is the reference its cold start is measured against
+REFERENCE_MODULES = ('argparse', 'importlib', 'queue', 'threading', 'itertools',
+                     'array', 'collections', 'contextlib', 'json')
+
+
+def synthetic_entries(num_dirs, files_per_dir, fanout=8):
+    """Yield structure dicts for a balanced synthetic tree in pre-order."""
+    def walk(level, index, remaining):
+        children = min(fanout, remaining)
+        files = ['README.md', '__init__.py'] + [
+            f"module_{index % 97}_{i}.py" for i in range(files_per_dir - 2)]
+        subdirs = [f"pkg_{index}_{i}" for i in range(children)]
+        yield {'dir': f"pkg_{index}", 'level': level, 'files': files, 'subdirs': subdirs}
+        remaining -= children
+        for i in range(children):
+            share = remaining // (children - i)
+            remaining -= share
+            yield from walk(level + 1, index * fanout + i + 1, share)
+
+    yield from walk(0, 0, num_dirs - 1)
+
+
+def measure(build):
+    """Return (result, bytes still allocated once build() returns)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def bench_memory(args):
+    structure, list_bytes = measure(
+        lambda: list(synthetic_entries(args.dirs, args.files)))
+    entries = len(structure)
+    del structure
+    table, table_bytes = measure(
+        lambda: DirectoryTable.from_entries(synthetic_entries(args.dirs, args.files)))
+
+    print(f"{entries} directories x {args.files} files")
+    print(f"{'representation':<16} {'MiB':>10} {'bytes/dir':>10}")
+    for name, size in (('list of dicts', list_bytes), ('DirectoryTable', table_bytes)):
+        print(f"{name:<16} {size / 2**20:>10.1f} {size / entries:>10.0f}")
+    print(f"reduction: {list_bytes / table_bytes:.1f}x ({len(table.names)} unique names)")
+
+
+def bench_formats(args):
+    structure = list(synthetic_entries(args.dirs, args.files))
+    directory = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(directory)
+        single = {}
+        for fmt in ('txt', 'natural', 'html', 'json', 'yaml', 'pdf'):
+            start = time.perf_counter()
+            save_to_file(structure, os.path.join(directory, 'single'), fmt)
+            single[fmt] = time.perf_counter() - start
+
+        print(f"{len(structure)} directories x {args.files} files")
+        for fmt, elapsed in single.items():
+            print(f"{fmt:<24} {elapsed:>8.3f} s")
+        print(f"{'sum of single formats':<24} {sum(single.values()):>8.3f} s")
+        print(f"{'slowest single format':<24} {max(single.values()):>8.3f} s")
+        for processes in (False, True):
+            start = time.perf_counter()
+            save_all_formats(structure, 'all', processes=processes)
+            label = 'all formats, processes' if processes else 'all formats, threads'
+            print(f"{label:<24} {time.perf_counter() - start:>8.3f} s")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+
+
+def bench_pdf(args):
+    files_per_dir = 50
+    num_dirs = max(1, args.lines // (files_per_dir + 1))
+    directory = tempfile.mkdtemp()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        # Feed a generator so the structure itself never sits in memory
+        save_to_pdf(synthetic_entries(num_dirs, files_per_dir), os.path.join(directory, 'tree'))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        lines = num_dirs * (files_per_dir + 1)
+        size = os.path.getsize(os.path.join(directory, 'tree.pdf'))
+    finally:
+        shutil.rmtree(directory)
+
+    # tracemalloc slows allocation-heavy code, so throughput is a lower bound
+    print(f"{lines} lines in {elapsed:.2f} s ({lines / elapsed:,.0f} lines/s)")
+    print(f"peak traced memory: {peak / 2**20:.1f} MiB ({peak / lines:.0f} bytes/line)")
+    print(f"output size: {size / 2**20:.1f} MiB")
+
+
+def import_profile(modules, env):
+    """
+    Return ({top-level module: cumulative microseconds}, {every module
+    imported}) for one cold import of modules.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    timings, imported = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported.add(name.strip())
+        # Nested imports are already part of their importer's cumulative time
+        if not name.startswith('  '):
+            timings[name.strip()] = int(cumulative)
+    return timings, imported
+
+
+def bench_startup(args):
+    ratios, timings, references = [], [], []
+    imported, reference_imported = set(), set()
+    # Byte-compile once into a private cache so every run times the import,
+    # not the compiler, whatever PYTHONDONTWRITEBYTECODE says
+    pycache = tempfile.mkdtemp()
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    try:
+        import_profile(['src.tree_writer'], env)
+        for _ in range(args.runs):
+            # Paired runs see the same machine load, which the ratio cancels
+            profile, modules = import_profile(['src.tree_writer'], env)
+            reference, reference_modules = import_profile(REFERENCE_MODULES, env)
+            timings.append(profile['src.tree_writer'] / 1000)
+            references.append(sum(reference.get(name, 0) for name in REFERENCE_MODULES) / 1000)
+            ratios.append(timings[-1] / references[-1])
+            imported |= modules
+            reference_imported |= reference_modules
+    finally:
+        shutil.rmtree(pycache)
+
+    ratio = statistics.median(ratios)
+    print(f"cold import of tree_writer: median {statistics.median(timings):.1f} ms, "
+          f"stdlib reference {statistics.median(references):.1f} ms over {args.runs} runs")
+    print(f"ratio to reference: median {ratio:.2f} (limit {args.max_ratio})")
+    failed = False
+    top_level = {name.split('.')[0] for name in BACKEND_MODULES.values()}
+    backends = imported & top_level
+    if backends:
+        print(f"FAIL: format backends imported at startup: {', '.join(sorted(backends))}")
+        failed = True
+    extra = imported - reference_imported - {'src', 'src.tree_writer'}
+    if extra:
+        print(f"FAIL: modules imported beyond the stdlib reference: {', '.join(sorted(extra))}")
+        failed = True
+    if ratio > args.max_ratio:
+        print("FAIL: cold start regressed")
+        failed = True
+    return 1 if failed else 0
+
+
+def make_tree(root, num_dirs, files_per_dir):
+    """Materialize synthetic_entries on disk under root and age every mtime."""
+    paths = [root]
+    for item in synthetic_entries(num_dirs, files_per_dir):
+        del paths[item['level'] + 1:]
+        path = os.path.join(paths[-1], item['dir']) if item['level'] else root
+        os.makedirs(path, exist_ok=True)
+        for name in item['files']:
+            open(os.path.join(path, name), 'w').close()
+        paths.append(path)
+    past = time.time() - 3600
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def bench_cache(args):
+    directory = tempfile.mkdtemp()
+    try:
+        root = os.path.join(directory, 'tree')
+        cache_dir = os.path.join(directory, 'cache')
+        make_tree(root, args.dirs, args.files)
+
+        def timed(label, walk):
+            start = time.perf_counter()
+            count = len(list(walk()))
+            print(f"{label:<12} {(time.perf_counter() - start) * 1000:>10.1f} ms  ({count} directories)")
+
+        timed('full walk', lambda: generate_directory_structure(root, -1))
+        timed('cold cache', lambda: iter_directory_structure_cached(root, -1, cache_dir))
+        timed('warm cache', lambda: iter_directory_structure_cached(root, -1, cache_dir))
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tree_writer.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    formats = subparsers.add_parser("formats", help="Single-format vs single-pass export")
+    formats.add_argument("--dirs", type=int, default=2000, help="Number of directories")
+    formats.add_argument("--files", type=int, default=10, help="Files per directory")
+    formats.set_defaults(func=bench_formats)
+
+    pdf = subparsers.add_parser("pdf", help="Paginated PDF throughput and memory")
+    pdf.add_argument("--lines", type=int, default=200000, help="Number of lines to render")
+    pdf.set_defaults(func=bench_pdf)
+
+    startup = subparsers.add_parser("startup", help="Cold import time regression check")
+    startup.add_argument("--runs", type=int, default=10, help="Number of fresh interpreters")
+    startup.add_argument("--max-ratio", type=float, default=1.5,
+                         help="Fail if the median import time exceeds this multiple of the "
+                              "stdlib reference")
+    startup.set_defaults(func=bench_startup)
+
+    cache = subparsers.add_parser("cache", help="Snapshot cache cold vs warm runs")
+    cache.add_argument("--dirs", type=int, default=2000, help="Number of directories")
+    cache.add_argument("--files", type=int, default=20, help="Files per directory")
+    cache.set_defaults(func=bench_cache)
+
+    memory = subparsers.add_parser("memory", help="Structure memory footprint")
+    memory.add_argument("--dirs", type=int, default=20000, help="Number of directories")
+    memory.add_argument("--files", type=int, default=20, help="Files per directory")
+    memory.set_defaults(func=bench_memory)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,25 @@
 import os
+import sys
 import json
+import argparse
+import codecs
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Default chunk size used when streaming input files into the master file
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Upper bound on file data held in memory by the parallel read-ahead stage
+PREFETCH_BYTES = 64 * 1024 * 1024
+
+# Bumped whenever the layout of the incremental build manifest changes
+MANIFEST_VERSION = 2
 
 def read_reading_order(repo_directory):
     """
@@ -18,12 +38,45 @@ def read_reading_order(repo_directory):
         print("Warning: reading_order.json found but could not be parsed properly")
         return None
 
-def is_valid_file(filepath, output_file, reading_order=None, base_dir=None):
+def build_reading_order_index(reading_order, base_dir=None):
+    """
+    Precompute lookup structures for a reading_order list so membership
+    checks and ordering are O(1) per file instead of O(entries).
+    Returns a dict with the entry->position map, the original entries and
+    a lazily computed count of entries that exist under base_dir.
+    """
+    positions = {}
+    for position, entry in enumerate(reading_order):
+        # Keep the first position if a document is listed more than once
+        positions.setdefault(entry['document'], position)
+    return {
+        'entries': reading_order,
+        'positions': positions,
+        'base_dir': base_dir,
+        'existing_count': None,
+    }
+
+def count_existing_entries(index):
+    """
+    Return how many reading_order entries exist on disk, stat'ing each
+    entry only the first time this is called for a given index.
+    """
+    if index['existing_count'] is None:
+        base_dir = index['base_dir'] or ''
+        index['existing_count'] = sum(
+            1 for entry in index['entries']
+            if os.path.exists(os.path.join(base_dir, entry['document']))
+        )
+    return index['existing_count']
+
+def is_valid_file(filepath, output_file, reading_order=None, base_dir=None, reading_order_index=None):
     """
     Check if a file should be included in the combination.
     Valid files are .md or .txt files that are not the output file itself or any master.md file.
     Files in subdirectories are only included if they're test6.txt (when no reading_order)
     or if they're explicitly listed in reading_order.
+    Pass a reading_order_index from build_reading_order_index to avoid
+    rebuilding it for every file.
     """
     # Get the base name of the output file for comparison
     output_base = os.path.basename(output_file) if output_file else None
@@ -48,19 +101,15 @@ def is_valid_file(filepath, output_file, reading_order=None, base_dir=None):
         is_in_subdir = '/' in rel_path.replace('\\', '/')
         if is_in_subdir:
             if reading_order:
-                # Check if this file is in reading_order
-                is_in_reading_order = any(entry['document'] == rel_path for entry in reading_order)
+                if reading_order_index is None:
+                    reading_order_index = build_reading_order_index(reading_order, base_dir)
                 # If file is in reading_order, allow it
                 # If file is test6.txt and reading_order has mostly missing files, allow it
-                if is_in_reading_order:
+                if rel_path in reading_order_index['positions']:
                     return True
                 if filename == 'test6.txt':
-                    # Count how many reading_order files actually exist
-                    existing_files = 0
-                    for entry in reading_order:
-                        if os.path.exists(os.path.join(base_dir, entry['document'])):
-                            existing_files += 1
                     # If most reading_order files are missing, treat it like no reading_order
+                    existing_files = count_existing_entries(reading_order_index)
                     return existing_files <= len(reading_order) // 2
                 return False
             else:
@@ -76,56 +125,395 @@ def collect_markdown_files(directory, reading_order=None, output_file=None):
     Files not in reading_order are appended at the end.
     Ignores master.md files and the output file itself.
     """
+    index = build_reading_order_index(reading_order, directory) if reading_order else None
+
     # First collect all valid files and their relative paths
     valid_files = []
     for root, _, files in os.walk(directory):
         for file in files:
             full_path = os.path.join(root, file)
-            if is_valid_file(full_path, output_file, reading_order, directory):
+            if is_valid_file(full_path, output_file, reading_order, directory, index):
                 rel_path = os.path.relpath(full_path, directory)
                 valid_files.append((rel_path, full_path))
 
     if reading_order:
-        # Create a map of relative paths to their full paths
-        file_map = {rel_path: full_path for rel_path, full_path in valid_files}
-
-        # First, collect files in the specified order
-        ordered_files = []
-        ordered_rel_paths = set()
+        positions = index['positions']
+        found = {rel_path for rel_path, _ in valid_files}
         for entry in reading_order:
-            doc_path = entry['document']
-            if doc_path in file_map:
-                ordered_files.append(file_map[doc_path])
-                ordered_rel_paths.add(doc_path)
-            else:
-                print(f"Warning: Specified file '{doc_path}' not found in repository")
+            if entry['document'] not in found:
+                print(f"Warning: Specified file '{entry['document']}' not found in repository")
 
-        # Then collect any remaining valid files
-        remaining_files = []
-        for rel_path, full_path in sorted(valid_files):  # Sort by relative path
-            if rel_path not in ordered_rel_paths:
-                remaining_files.append(full_path)
+        # Files listed in reading_order come first in that order, the rest
+        # follow sorted by relative path
+        def sort_key(item):
+            rel_path = item[0]
+            position = positions.get(rel_path)
+            if position is None:
+                return (1, 0, rel_path)
+            return (0, position, rel_path)
 
-        return ordered_files + remaining_files
+        return [full_path for _, full_path in sorted(valid_files, key=sort_key)]
     else:
         # When no reading_order is provided, return all files sorted by relative path
         return [full_path for _, full_path in sorted(valid_files)]
 
-def combine_markdown_files(files, output_file):
+def peak_memory_mib():
+    """
+    Return the peak resident set size of the current process in MiB.
+    Returns None on platforms without the resource module.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def _iter_utf8_chunks(src, buffer_size):
+    """
+    Yield the bytes of a binary UTF-8 stream in chunks of about buffer_size,
+    with CRLF and CR newlines translated to LF as text mode reading would.
+    Invalid UTF-8 raises UnicodeDecodeError. Only chunks with non-ASCII
+    bytes are decoded, and only to validate them; the bytes are passed on
+    as they are.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffered = b''
+    carry = b''
+    while True:
+        chunk = src.read(buffer_size)
+        if not chunk:
+            decoder.decode(b'', final=True)
+            if carry:
+                yield b'\n'
+            return
+        if buffered or not chunk.isascii():
+            decoder.decode(chunk)
+            buffered = decoder.getstate()[0]
+        chunk = carry + chunk
+        # A trailing CR may be the first half of a CRLF split across chunks
+        carry = b'\r' if chunk.endswith(b'\r') else b''
+        if carry:
+            chunk = chunk[:-1]
+        if b'\r' in chunk:
+            chunk = chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        if chunk:
+            yield chunk
+
+def _copy_utf8(src, dst, buffer_size, hasher=None):
+    """
+    Copy a binary UTF-8 stream into dst chunk by chunk, skipping the
+    decode and re-encode of _copy_text while producing the same bytes.
+    """
+    for chunk in _iter_utf8_chunks(src, buffer_size):
+        if hasher is not None:
+            hasher.update(chunk)
+        dst.write(chunk)
+
+def _copy_text(src, dst, buffer_size, hasher=None):
+    """
+    Copy a text stream into a binary destination chunk by chunk,
+    re-encoding each chunk as UTF-8.
+    """
+    while True:
+        chunk = src.read(buffer_size)
+        if not chunk:
+            return
+        data = chunk.encode('utf-8')
+        if hasher is not None:
+            hasher.update(data)
+        dst.write(data)
+
+def _copy_range(src, dst, offset, length, buffer_size):
+    """
+    Copy length bytes starting at offset in src into dst. Uses
+    os.copy_file_range where available so the kernel can share or clone
+    the blocks, otherwise falls back to a chunked read/write loop.
+    """
+    if hasattr(os, 'copy_file_range'):
+        dst.flush()
+        in_fd, out_fd = src.fileno(), dst.fileno()
+        try:
+            while length > 0:
+                copied = os.copy_file_range(in_fd, out_fd, min(length, buffer_size), offset)
+                if copied == 0:
+                    break
+                offset += copied
+                length -= copied
+        except OSError:
+            pass
+    src.seek(offset)
+    while length > 0:
+        chunk = src.read(min(length, buffer_size))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+def _is_utf8(encoding):
+    return encoding.lower().replace('_', '-') in ('utf-8', 'utf8')
+
+def _file_header(file):
+    return f"\n<!-- START OF FILE: {file} -->\n\n".encode('utf-8')
+
+def _file_footer(file):
+    return f"\n\n<!-- END OF FILE: {file} -->\n".encode('utf-8')
+
+def _write_file_body(master_file, file, buffer_size, encoding, hasher=None):
+    """Stream the body of one input file into the open master file."""
+    if _is_utf8(encoding):
+        with open(file, 'rb') as f:
+            _copy_utf8(f, master_file, buffer_size, hasher)
+    else:
+        with open(file, 'r', encoding=encoding) as f:
+            _copy_text(f, master_file, buffer_size, hasher)
+
+def _print_summary(files, output_file, detail=None):
+    parts = [detail] if detail else []
+    peak = peak_memory_mib()
+    if peak is not None:
+        parts.append(f"peak memory: {peak:.1f} MiB")
+    suffix = f" ({', '.join(parts)})" if parts else ""
+    print(f"Combined {len(files)} files into {output_file}{suffix}")
+
+def _read_body(file, encoding, max_size):
+    """
+    Read a whole input file as the UTF-8 bytes it contributes to the master
+    file. Returns None without reading if the file is larger than max_size,
+    leaving it to be streamed instead.
+    """
+    with open(file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > max_size:
+            return None
+        data = f.read()
+    # Mirror text mode reading so prefetched and streamed output agree
+    if _is_utf8(encoding):
+        data.decode('utf-8')
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        return data
+    text = data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+    return text.encode('utf-8')
+
+def _prefetch_bodies(files, encoding, workers, prefetch_bytes):
+    """
+    Read files ahead on a thread pool and yield (file, data) strictly in
+    input order. At most 2 * workers bodies are held at once, counting the
+    one the caller is writing, and each holds at most
+    prefetch_bytes / (2 * workers) bytes, so buffered data never exceeds
+    prefetch_bytes. Larger files yield None and are streamed by
+    the caller.
+    """
+    window = 2 * workers
+    max_size = prefetch_bytes // window
+    pending = deque()
+    remaining = iter(files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for file in remaining:
+                pending.append((file, executor.submit(_read_body, file, encoding, max_size)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                file, future = pending.popleft()
+                data = future.result()
+                yield file, data
+                # Refill only once the writer is done with this body, so the
+                # yielded body and the window together stay within budget
+                del data
+                for next_file in remaining:
+                    pending.append((next_file, executor.submit(_read_body, next_file, encoding, max_size)))
+                    break
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+def combine_markdown_files(files, output_file, buffer_size=COPY_BUFFER_SIZE, encoding='utf-8',
+                           workers=1, prefetch_bytes=PREFETCH_BYTES):
     """
     Combine the contents of markdown and text files into one master file.
+    Input files are streamed in chunks of buffer_size so memory use stays
+    bounded regardless of file size. UTF-8 inputs are validated and copied
+    as bytes; any other encoding is decoded and re-encoded to UTF-8 chunk
+    by chunk. Either way newlines are normalized to LF, as text mode
+    reading would.
+
+    With workers > 1, files are read ahead concurrently on a thread pool,
+    holding at most prefetch_bytes of data, which hides per-file latency on
+    network filesystems. Output order is unchanged.
     """
-    with open(output_file, 'w', encoding='utf-8') as master_file:
-        for file in files:
+    if workers > 1:
+        bodies = _prefetch_bodies(files, encoding, workers, prefetch_bytes)
+    else:
+        bodies = ((file, None) for file in files)
+
+    with open(output_file, 'wb') as master_file:
+        for file, data in bodies:
             # Write a header marking the start of a file
-            master_file.write(f"\n<!-- START OF FILE: {file} -->\n\n")
-            with open(file, 'r', encoding='utf-8') as f:
-                master_file.write(f.read())
+            master_file.write(_file_header(file))
+            if data is None:
+                _write_file_body(master_file, file, buffer_size, encoding)
+            else:
+                master_file.write(data)
             # Write a footer marking the end of a file
-            master_file.write(f"\n\n<!-- END OF FILE: {file} -->\n")
-    print(f"Combined {len(files)} files into {output_file}")
+            master_file.write(_file_footer(file))
+
+    _print_summary(files, output_file)
+
+def manifest_path_for(output_file):
+    """Return the default sidecar manifest path for an output file."""
+    return output_file + '.manifest.json'
+
+def load_manifest(manifest_file, output_file, encoding='utf-8'):
+    """
+    Load an incremental build manifest. Returns None if it is missing,
+    unreadable, written for a different encoding, or if the output file
+    has changed since the manifest was written.
+    """
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        output_stat = os.stat(output_file)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('encoding') != encoding
+            or manifest.get('output_size') != output_stat.st_size
+            or manifest.get('output_mtime_ns') != output_stat.st_mtime_ns):
+        return None
+    return manifest
+
+def _save_manifest(manifest_file, manifest):
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+def _digest_file(file, buffer_size, encoding):
+    """Return the sha256 of a file's body as it would be written to the master file."""
+    hasher = hashlib.sha256()
+    if _is_utf8(encoding):
+        with open(file, 'rb') as f:
+            for chunk in _iter_utf8_chunks(f, buffer_size):
+                hasher.update(chunk)
+    else:
+        with open(file, 'r', encoding=encoding) as f:
+            for chunk in iter(lambda: f.read(buffer_size), ''):
+                hasher.update(chunk.encode('utf-8'))
+    return hasher.hexdigest()
+
+def combine_markdown_files_incremental(files, output_file, manifest_file=None,
+                                       buffer_size=COPY_BUFFER_SIZE, encoding='utf-8'):
+    """
+    Combine files like combine_markdown_files, but reuse the previous
+    output where possible. A sidecar manifest records the path, mtime,
+    size and sha256 of each segment together with the byte offsets of its
+    START/END block in the output.
+
+    Files whose mtime and size are unchanged are not read at all; files
+    that were only touched are hashed and kept if their content matches.
+    If nothing changed the output is left alone, otherwise it is rebuilt
+    by copying unchanged segments out of the previous output and reading
+    only the changed files.
+
+    Returns a dict with the number of 'reused' and 'rebuilt' segments.
+    """
+    if manifest_file is None:
+        manifest_file = manifest_path_for(output_file)
+    previous = load_manifest(manifest_file, output_file, encoding)
+    cached = {}
+    if previous:
+        cached = {segment['path']: segment for segment in previous['segments']}
+
+    # Decide for every file whether its previous segment can be reused
+    plan = []
+    for file in files:
+        file_stat = os.stat(file)
+        segment = cached.get(file)
+        if segment is not None and segment['size'] == file_stat.st_size:
+            if segment['mtime_ns'] != file_stat.st_mtime_ns:
+                if _digest_file(file, buffer_size, encoding) != segment['sha256']:
+                    segment = None
+        else:
+            segment = None
+        plan.append((file, file_stat, segment))
+
+    reused = sum(1 for _, _, segment in plan if segment is not None)
+    rebuilt = len(plan) - reused
+    unchanged_layout = (previous is not None and rebuilt == 0
+                        and [segment['path'] for segment in previous['segments']] == list(files))
+
+    segments = []
+    if unchanged_layout:
+        # Only refresh mtimes of touched files; the output is already correct
+        for file, file_stat, segment in plan:
+            segments.append(dict(segment, mtime_ns=file_stat.st_mtime_ns))
+    else:
+        tmp_output = output_file + '.tmp'
+        previous_output = open(output_file, 'rb') if reused else None
+        try:
+            with open(tmp_output, 'wb') as master_file:
+                for file, file_stat, segment in plan:
+                    start = master_file.tell()
+                    if segment is not None:
+                        _copy_range(previous_output, master_file, segment['start'],
+                                    segment['end'] - segment['start'], buffer_size)
+                        digest = segment['sha256']
+                    else:
+                        hasher = hashlib.sha256()
+                        master_file.write(_file_header(file))
+                        _write_file_body(master_file, file, buffer_size, encoding, hasher)
+                        master_file.write(_file_footer(file))
+                        digest = hasher.hexdigest()
+                    segments.append({
+                        'path': file,
+                        'mtime_ns': file_stat.st_mtime_ns,
+                        'size': file_stat.st_size,
+                        'sha256': digest,
+                        'start': start,
+                        'end': master_file.tell(),
+                    })
+        finally:
+            if previous_output is not None:
+                previous_output.close()
+        os.replace(tmp_output, output_file)
+
+    output_stat = os.stat(output_file)
+    _save_manifest(manifest_file, {
+        'version': MANIFEST_VERSION,
+        'encoding': encoding,
+        'output_size': output_stat.st_size,
+        'output_mtime_ns': output_stat.st_mtime_ns,
+        'segments': segments,
+    })
+
+    if unchanged_layout:
+        _print_summary(files, output_file, "up to date")
+    else:
+        _print_summary(files, output_file, f"{reused} reused, {rebuilt} rebuilt")
+    return {'reused': reused, 'rebuilt': rebuilt}
+
+def _ask(prompt):
+    """Prompt for a line of input, treating end of input as an empty answer."""
+    try:
+        return input(prompt).strip()
+    except EOFError:
+        return ''
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Combine the markdown and text files of a repository into one file.")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="Only rebuild changed files, reusing the previous output; "
+                             "asked interactively when omitted")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of threads reading files ahead, defaults to 1")
+    parser.add_argument("--prefetch-bytes", type=int, default=PREFETCH_BYTES,
+                        help=f"Most file data held by read-ahead, defaults to {PREFETCH_BYTES}")
+    args = parser.parse_args(argv)
 
-def main():
     # Define the directory to scan and the output file
     repo_directory = input("Enter the path to the repository: ").strip()
     output_file = input("Enter the name of the master markdown file: ").strip()
@@ -141,8 +529,16 @@ def main():
         print("No valid files found in the repository.")
         return
 
-    # Combine them into the master markdown file
-    combine_markdown_files(markdown_files, output_file)
+    # Combine them into the master markdown file, reusing the previous
+    # output when a manifest from an earlier run is available
+    incremental = args.incremental
+    if incremental is None:
+        incremental = _ask("Only rebuild changed files? [y/N]: ").lower() == 'y'
+    if incremental:
+        combine_markdown_files_incremental(markdown_files, output_file)
+    else:
+        combine_markdown_files(markdown_files, output_file, workers=args.workers,
+                               prefetch_bytes=args.prefetch_bytes)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,13 +9,140 @@ This tool allows users to:
 - Include edge cases and random variations
 """
 
+import io
+import os
+import sys
 import random
 import csv
+import sqlite3
+import copy
+import collections.abc
+import math
+import functools
+import struct
+import shutil
+import hashlib
 import datetime
+import statistics
 import string
-from typing import List, Dict, Any, Optional
+import itertools
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+# Value distributions accepted by ColumnConfig.distribution
+DISTRIBUTIONS = ('uniform', 'normal', 'exponential', 'zipf', 'weighted')
+# A 'normal' range holding less probability than this cannot be sampled
+# accurately; below REJECTION_MIN_MASS the numpy backend inverts the CDF
+# instead of redrawing out-of-range values
+NORMAL_MIN_MASS = 1e-12
+REJECTION_MIN_MASS = 0.5
+
+# Backends accepted by TestDataGenerator: per-cell pure Python, or one
+# vectorized NumPy batch per column
+BACKENDS = ('python', 'numpy')
+
+# Date range used by the 'date' data type
+DATE_START = datetime.date(2000, 1, 1)
+DATE_END = datetime.date(2023, 12, 31)
+EMAIL_DOMAINS = ['example.com', 'test.org', 'sample.net']
+# Rows generated and written per batch by the streaming APIs
+DEFAULT_BATCH_SIZE = 10000
+# Distinct values of the 'phone' data type: NNN-NNN-NNNN with 100-999,
+# 100-999 and 1000-9999 parts
+PHONE_NUMBERS = 900 * 900 * 9000
+# Random bytes drawn at a time by each CharPool
+POOL_BYTES = 1 << 16
+# Pool size for generating a single value outside the plan, enough for
+# any one string, email or phone number in a single draw most of the time
+ONE_VALUE_POOL_BYTES = 32
+# to_arrow(dictionary=True) dictionary-encodes text columns with at most
+# this many distinct values per row
+DICTIONARY_MAX_RATIO = 0.5
+# SQLite column types by data type; everything else is TEXT
+SQLITE_TYPES = {'integer': 'INTEGER', 'float': 'REAL'}
+# Row index whose counter-based stream seeds a column's compile-time state
+COMPILE_ROW = 2 ** 64 - 1
+# Consecutive rejected candidates after which a unique string-like column
+# is considered exhausted
+MAX_UNIQUE_RETRIES = 1000
+
+
+def shard_seed(seed: int, shard: int, start_row: int = 0) -> int:
+    """
+    Derive an independent, deterministic 64-bit seed for one shard of a
+    run starting at start_row, so consecutive runs do not repeat rows.
+    """
+    digest = hashlib.sha256(f"{seed}:{start_row}:{shard}".encode('ascii')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def shard_sizes(num_rows: int, shards: int) -> List[int]:
+    """Split num_rows as evenly as possible into shards parts, larger parts first."""
+    base, extra = divmod(num_rows, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def _write_shard(columns: List['ColumnConfig'], backend: str, seed: int, filepath: str,
+                 num_rows: int, batch_size: int, header: bool,
+                 references: Dict[str, Sequence[Any]], uniques: Dict[str, Any],
+                 counter_based: bool = False, start_row: int = 0,
+                 samplers: Optional[Dict[str, 'UniqueKeySampler']] = None
+                 ) -> Tuple[str, Dict[str, 'UniqueFilter']]:
+    """
+    Process pool entry point: generate one shard into its own CSV file.
+    Returns the path and the shard's UniqueFilters, for the parent to merge.
+    """
+    generator = TestDataGenerator(columns, seed=seed, backend=backend, references=references,
+                                  counter_based=counter_based)
+    # Continue the parent's unique columns rather than starting afresh
+    generator.uniques.update(uniques)
+    generator.samplers.update(samplers or {})
+    generator._compile_plan()
+    generator.next_row = start_row
+    with open(filepath, 'w', newline='') as csvfile:
+        generator._write_rows(csvfile, num_rows, batch_size, header)
+    return filepath, {name: unique for name, unique in generator.uniques.items()
+                      if isinstance(unique, UniqueFilter)}
+
+
+def _require_pyarrow():
+    """Import pyarrow on demand; it is only needed for Arrow and Parquet output."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow and Parquet output require pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _npy_bytes(descr: str, length: int, payload: bytes) -> bytes:
+    """Wrap a little-endian 1-D payload in an .npy (format 1.0/2.0) header."""
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    # The data must start on a 64-byte boundary; the header ends in a newline
+    for version, size_format in ((1, '<H'), (2, '<I')):
+        prefix_len = 8 + struct.calcsize(size_format)
+        padded = header + ' ' * (-(prefix_len + len(header) + 1) % 64) + '\n'
+        if version == 2 or len(padded) < 2 ** 16:
+            break
+    prefix = b'\x93NUMPY' + bytes([version, 0]) + struct.pack(size_format, len(padded))
+    return prefix + padded.encode('latin-1') + payload
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _require_numpy():
+    """Import NumPy on demand; it is only needed by the 'numpy' backend."""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The 'numpy' backend requires NumPy: pip install numpy") from None
+    return numpy
+
 @dataclass
 class ColumnConfig:
     """Configuration for a single column in the test data."""
@@ -26,85 +153,1050 @@ class ColumnConfig:
     pattern: Optional[str] = None
     related_to: Optional[str] = None  # Name of column this one relates to
     null_probability: float = 0.0  # Probability of generating NULL values
+    unique: bool = False  # Never repeat a value in this column
+    distribution: str = 'uniform'  # One of DISTRIBUTIONS
+    choices: Optional[List[Any]] = None  # Values of a 'weighted' or 'zipf' column
+    weights: Optional[List[float]] = None  # Relative weight of each choice ('weighted')
+    mean: Optional[float] = None  # 'normal'/'exponential' mean, defaults from the range
+    stddev: Optional[float] = None  # 'normal' standard deviation, defaults to range / 6
+    exponent: float = 1.0  # 'zipf' skew: P(rank k) is proportional to 1 / k ** exponent
+
+
+class AliasTable:
+    """
+    Vose's alias method: draws an index with probability proportional to
+    its weight in O(1), from a single uniform number, however many weights
+    there are.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        count = len(weights)
+        total = float(sum(weights))
+        if not count or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+        scaled = [w * count / total for w in weights]
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less], self.alias[less] = scaled[less], more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def index(self, fraction: float) -> int:
+        """Map a uniform fraction in [0, 1) to a weighted index."""
+        scaled = fraction * len(self.prob)
+        column = int(scaled)
+        return column if scaled - column < self.prob[column] else self.alias[column]
+
+    def index_array(self, fractions: Any) -> Any:
+        """index() over a NumPy array of fractions."""
+        np = _require_numpy()
+        scaled = fractions * len(self.prob)
+        columns = scaled.astype(np.int64)
+        keep = (scaled - columns) < np.asarray(self.prob)[columns]
+        return np.where(keep, columns, np.asarray(self.alias)[columns])
+
+
+class ZipfSampler:
+    """
+    Draws ranks 0..count-1 with P(rank k) proportional to 1 / (k + 1) **
+    exponent by rejection-inversion (Hormann and Derflinger, 1996): O(1)
+    expected time and no table, so count can be in the billions. Fewer
+    than one draw in ten is rejected.
+    """
+
+    def __init__(self, count: int, exponent: float):
+        if count < 1 or exponent <= 0:
+            raise ValueError("zipf needs at least one value and a positive exponent")
+        self.count = count
+        self.exponent = exponent
+        self.h_x1 = self._h_integral(1.5) - 1.0
+        self.h_n = self._h_integral(count + 0.5)
+        self.threshold = 2.0 - self._h_integral_inverse(self._h_integral(2.5) - self._h(2.0))
+
+    @staticmethod
+    def _log1p_ratio(x: float) -> float:
+        return math.log1p(x) / x if abs(x) > 1e-8 else 1.0 - x * (0.5 - x * (1 / 3 - 0.25 * x))
+
+    @staticmethod
+    def _expm1_ratio(x: float) -> float:
+        return math.expm1(x) / x if abs(x) > 1e-8 else 1.0 + x * 0.5 * (1.0 + x / 3 * (1.0 + 0.25 * x))
+
+    def _h(self, x: float) -> float:
+        return math.exp(-self.exponent * math.log(x))
+
+    def _h_integral(self, x: float) -> float:
+        log_x = math.log(x)
+        return self._expm1_ratio((1.0 - self.exponent) * log_x) * log_x
+
+    def _h_integral_inverse(self, x: float) -> float:
+        t = max(-1.0, x * (1.0 - self.exponent))
+        return math.exp(self._log1p_ratio(t) * x)
+
+    def rank(self, draw: Callable[[], float]) -> int:
+        """Draw one rank, calling draw() for uniform fractions in [0, 1)."""
+        h_n, width, one_minus_s = self.h_n, self.h_x1 - self.h_n, 1.0 - self.exponent
+        log1p, exp = math.log1p, math.exp
+        while True:
+            u = h_n + draw() * width
+            # _h_integral_inverse(u), inlined: this is the hot path
+            t = max(-1.0, u * one_minus_s)
+            x = exp((log1p(t) / t if abs(t) > 1e-8 else 1.0 - t * (0.5 - t * (1 / 3 - 0.25 * t))) * u)
+            k = min(max(int(x + 0.5), 1), self.count)
+            if k - x <= self.threshold or u >= self._h_integral(k + 0.5) - self._h(k):
+                return k - 1
+
+    def rank_array(self, rng: Any, size: int) -> Any:
+        """Draw size ranks with a NumPy Generator, redrawing rejections in bulk."""
+        np = _require_numpy()
+        ranks = np.empty(size, dtype=np.int64)
+        pending = np.arange(size)
+        one_minus_s = 1.0 - self.exponent
+        while len(pending):
+            u = self.h_n + rng.random(len(pending)) * (self.h_x1 - self.h_n)
+            t = np.maximum(-1.0, u * one_minus_s)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(np.abs(t) > 1e-8, np.log1p(t) / t,
+                                 1.0 - t * (0.5 - t * (1 / 3 - 0.25 * t)))
+                x = np.exp(ratio * u)
+                k = np.clip((x + 0.5).astype(np.int64), 1, self.count)
+                log_k = np.log(k + 0.5)
+                y = one_minus_s * log_k
+                expm1_ratio = np.where(np.abs(y) > 1e-8, np.expm1(y) / y,
+                                       1.0 + y * 0.5 * (1.0 + y / 3 * (1.0 + 0.25 * y)))
+                h_k = np.exp(-self.exponent * np.log(k))
+                accept = (k - x <= self.threshold) | (u >= expm1_ratio * log_k - h_k)
+            ranks[pending[accept]] = k[accept] - 1
+            pending = pending[~accept]
+        return ranks
+
+
+class UniqueKeySampler:
+    """
+    Draws keys from a key array without replacement in O(1) per draw.
+
+    This is a Fisher-Yates shuffle of the key positions, done lazily: only
+    positions that have been swapped are stored, so memory grows with the
+    number of draws rather than the number of keys.
+    """
+
+    def __init__(self, keys: Sequence[Any]):
+        self.keys = keys
+        self.drawn = 0
+        self.swaps: Dict[int, int] = {}
+
+    def draw(self, fraction: float) -> Any:
+        """Return an undrawn key, chosen by a uniform fraction in [0, 1)."""
+        swaps, drawn, num_keys = self.swaps, self.drawn, len(self.keys)
+        if drawn >= num_keys:
+            raise ValueError(f"All {num_keys} unique keys have been drawn")
+        position = drawn + int(fraction * (num_keys - drawn))
+        picked = swaps.pop(position, position)
+        if position != drawn:
+            swaps[position] = swaps.pop(drawn, drawn)
+        self.drawn = drawn + 1
+        return self.keys[picked]
+
+@functools.lru_cache(maxsize=None)
+def _byte_translation(alphabet: str) -> Tuple[bytes, bytes]:
+    """
+    bytes.translate arguments that map random bytes uniformly onto
+    alphabet: bytes at or above the largest multiple of len(alphabet) are
+    deleted rather than folded in.
+    """
+    count = len(alphabet)
+    return bytes(ord(alphabet[i % count]) for i in range(256)), bytes(range(256 - 256 % count, 256))
+
+
+class CharPool:
+    """
+    Serves random characters from an alphabet of up to 256 characters by
+    carving them, in order, out of one large random buffer that is
+    refilled when it runs out.
+
+    Random bytes are mapped onto the alphabet with _byte_translation, so
+    every character stays equally likely.
+    """
+
+    def __init__(self, rand: Any, alphabet: str, size: int = POOL_BYTES):
+        self.getrandbits = rand.getrandbits
+        self.size = size
+        self.table, self.delete = _byte_translation(alphabet)
+        self.text = ''
+        self.position = 0
+
+    def take(self, count: int) -> str:
+        """Return the next count random characters."""
+        position = self.position
+        end = position + count
+        while end > len(self.text):
+            raw = self.getrandbits(self.size * 8).to_bytes(self.size, 'little')
+            self.text = self.text[position:] + raw.translate(self.table, self.delete).decode('latin-1')
+            position, end = 0, count
+        self.position = end
+        return self.text[position:end]
+
+
+def _lengths(low: int, high: int) -> str:
+    """An alphabet whose characters are the lengths low..high, for ord(pool.take(1))."""
+    return ''.join(map(chr, range(low, high + 1)))
+
+
+@functools.lru_cache(maxsize=None)
+def iso_dates() -> List[str]:
+    """ISO strings of every date from DATE_START to DATE_END, by day offset."""
+    first = DATE_START.toordinal()
+    return [datetime.date.fromordinal(first + offset).isoformat()
+            for offset in range((DATE_END - DATE_START).days + 1)]
+
+
+@functools.lru_cache(maxsize=None)
+def _iso_date_array() -> Any:
+    """iso_dates() as a NumPy object array, for vectorized lookups."""
+    return _require_numpy().array(iso_dates(), dtype=object)
+
+
+def splitmix64(x: int) -> int:
+    """The splitmix64 finalizer: a fast, well-mixed bijection on 64-bit ints."""
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class CounterRandom(random.Random):
+    """
+    A random.Random whose every output is a pure function of (seed,
+    column, row, draw number), so any cell can be generated on its own.
+
+    seek(column, row) selects a cell. Each row hashes to a key, and the
+    n-th draw for a column is splitmix64(key + (column * 2**32 + n) *
+    golden ratio): column c reads positions c * 2**32 onwards of a
+    splitmix64 generator started at the row's key. The key is only
+    recomputed when the row changes. All of random.Random's methods
+    (randint, choice, uniform, ...) work on top of it.
+    """
+
+    GOLDEN = 0x9E3779B97F4A7C15
+
+    def seed(self, a: Any = None, version: int = 2) -> None:
+        self.base = splitmix64(int(a or 0) & 0xFFFFFFFFFFFFFFFF)
+        self.row = None
+        self.seek(0, 0)
+
+    def seek(self, column: int, row: int) -> None:
+        """Start the stream of the cell at column, row."""
+        if row != self.row:
+            self.row = row
+            self.row_key = splitmix64(self.base ^ splitmix64(row & 0xFFFFFFFFFFFFFFFF))
+        self.state = (self.row_key + (column << 32) * self.GOLDEN) & 0xFFFFFFFFFFFFFFFF
+
+    def next64(self) -> int:
+        """The cell's next 64 random bits."""
+        self.state = (self.state + self.GOLDEN) & 0xFFFFFFFFFFFFFFFF
+        return splitmix64(self.state)
+
+    def random(self) -> float:
+        return (self.next64() >> 11) * (1.0 / 9007199254740992.0)
+
+    def getrandbits(self, k: int) -> int:
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = value << 64 | self.next64()
+        return value >> (-k % 64)
+
+    def getstate(self) -> Tuple[int, Optional[int], int, int]:
+        return self.base, self.row, self.row_key, self.state
+
+    def setstate(self, state: Tuple[int, Optional[int], int, int]) -> None:
+        self.base, self.row, self.row_key, self.state = state
+
+
+class UniquePermutation:
+    """
+    A keyed pseudo-random bijection on range(size), walked in order.
+
+    Position i maps to a balanced Feistel network over the smallest even
+    number of bits covering size, with out-of-range outputs fed back in
+    (cycle walking) until they land in range. Every value comes out exactly
+    once in O(1) time and memory, whatever the size; cycle walking averages
+    under four rounds per value.
+    """
+
+    ROUNDS = 6
+    MULTIPLIER = 0x9E3779B1
+
+    def __init__(self, size: int, rand: Any):
+        if not 0 < size <= 2 ** 64:
+            raise ValueError(f"Unique value range must hold 1 to 2**64 values, not {size}")
+        bits = max(2, (size - 1).bit_length())
+        self.size = size
+        self.half = (bits + 1) // 2
+        self.mask = (1 << self.half) - 1
+        self.keys = [rand.getrandbits(self.half) for _ in range(self.ROUNDS)]
+        self.position = 0
+
+    def permute(self, x: Any) -> Any:
+        """Apply the Feistel rounds to an int or a NumPy uint64 array."""
+        half, mask, multiplier = self.half, self.mask, self.MULTIPLIER
+        left, right = x >> half, x & mask
+        for key in self.keys:
+            left, right = right, left ^ ((((right ^ key) * multiplier) >> half) & mask)
+        return (left << half) | right
+
+    def _reserve(self, count: int) -> int:
+        start = self.position
+        if start + count > self.size:
+            raise ValueError(f"All {self.size} unique values have been generated")
+        self.position = start + count
+        return start
+
+    def at(self, index: int) -> int:
+        """Return the value at position index, without moving the position."""
+        if not 0 <= index < self.size:
+            raise ValueError(f"All {self.size} unique values have been generated")
+        x = self.permute(index)
+        while x >= self.size:
+            x = self.permute(x)
+        return x
+
+    def next(self) -> int:
+        """Return the next value in range(size)."""
+        return self.at(self._reserve(1))
+
+    def next_array(self, count: int) -> Any:
+        """Return the next count values as a NumPy uint64 array."""
+        np = _require_numpy()
+        start = self._reserve(count)
+        x = self.permute(np.arange(start, start + count, dtype=np.uint64))
+        out = x >= self.size
+        while out.any():
+            x[out] = self.permute(x[out])
+            out = x >= self.size
+        return x
+
+    def for_shard(self, offset: int) -> 'UniquePermutation':
+        """Return a copy positioned offset values further on."""
+        shard = copy.copy(self)
+        shard.position = self.position + offset
+        return shard
+
+
+class UniqueFilter:
+    """
+    Remembers the values of a unique column in a scalable, blocked Bloom
+    filter, about 10 bits per value instead of a set's 60+ bytes.
+
+    add() returns False for a value that may have been seen, so the caller
+    discards it and draws another: a false positive (around 5% of new
+    values by a million entries) costs one extra draw, but a duplicate can
+    never get through. Each stage sets seven bits in a single 64-bit word,
+    and stages double in capacity as they fill, so no size has to be known
+    up front. Each add costs about 5us in pure Python.
+    With a partition (index, count), only values hashing to index modulo
+    count are accepted, which keeps sharded outputs disjoint.
+    """
+
+    BITS_PER_VALUE = 10
+    FIRST_CAPACITY = 1 << 16
+
+    def __init__(self, partition: Tuple[int, int] = (0, 1)):
+        self.partition = partition
+        self.stages: List[array] = []
+        self.capacity = self.FIRST_CAPACITY // 2
+        self.filled = self.capacity
+        self.max_retries = MAX_UNIQUE_RETRIES * partition[1]
+
+    def add(self, value: Any) -> bool:
+        """Record value and return True if it has definitely not been added before."""
+        digest = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=16).digest(), 'little')
+        index, count = self.partition
+        if count > 1 and (digest & 0xFFFFFFFF) % count != index:
+            return False
+        word = digest >> 32 & 0xFFFFFFFF
+        # Seven bits of one 64-bit word, picked by six-bit slices of the digest
+        mask = (1 << (digest >> 64 & 63) | 1 << (digest >> 70 & 63) | 1 << (digest >> 76 & 63)
+                | 1 << (digest >> 82 & 63) | 1 << (digest >> 88 & 63) | 1 << (digest >> 94 & 63)
+                | 1 << (digest >> 100 & 63))
+        for stage in self.stages:
+            if stage[word % len(stage)] & mask == mask:
+                return False
+        if self.filled >= self.capacity:
+            self.capacity *= 2
+            self.filled = 0
+            self.stages.append(array('Q', bytes(self.capacity * self.BITS_PER_VALUE // 8)))
+        stage = self.stages[-1]
+        stage[word % len(stage)] |= mask
+        self.filled += 1
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the filter's bit arrays."""
+        return sum(stage.itemsize * len(stage) for stage in self.stages)
+
+    def for_shard(self, shard: int, shards: int) -> 'UniqueFilter':
+        """Return a copy that only accepts this shard's share of new values."""
+        copied = copy.deepcopy(self)
+        copied.partition = (shard, shards)
+        copied.max_retries = MAX_UNIQUE_RETRIES * shards
+        return copied
+
+    def merge(self, shards: List['UniqueFilter']) -> None:
+        """
+        Fold in the values added to copies made by for_shard. A stage's size
+        depends only on its position, so stages are combined by OR-ing their
+        bits, and the last stage's fill counts what every copy added to it.
+        """
+        last = len(self.stages)
+        for shard in shards:
+            for index, stage in enumerate(shard.stages):
+                if index == len(self.stages):
+                    self.stages.append(array('Q', stage))
+                    continue
+                size = len(stage) * stage.itemsize
+                bits = (int.from_bytes(self.stages[index].tobytes(), 'little')
+                        | int.from_bytes(stage.tobytes(), 'little'))
+                self.stages[index] = array('Q', bits.to_bytes(size, 'little'))
+        if not self.stages:
+            return
+        # Copies started from this filter's fill if they share its last stage
+        shared = self.filled if len(self.stages) == last else 0
+        self.filled = shared + sum(shard.filled - shared for shard in shards
+                                   if len(shard.stages) == len(self.stages))
+        self.capacity = self.FIRST_CAPACITY << (len(self.stages) - 1)
+
 
 class TestDataGenerator:
     """Generates test data based on provided configuration."""
     
-    def __init__(self, columns: List[ColumnConfig]):
-        """Initialize the generator with column configurations."""
+    def __init__(self, columns: List[ColumnConfig], seed: Optional[int] = None,
+                 backend: str = 'python', references: Optional[Dict[str, Sequence[Any]]] = None,
+                 counter_based: bool = False):
+        """Initialize the generator with column configurations, compiled once into self.plan."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}")
+        if counter_based and backend != 'python':
+            raise ValueError("counter_based generation needs the 'python' backend")
+        if counter_based and seed is None:
+            seed = random.getrandbits(64)
         self.columns = columns
+        self.seed = seed
+        self.backend = backend
+        self.counter_based = counter_based
+        # Rows handed out so far; counter-based generation continues from here
+        self.next_row = 0
+        if counter_based:
+            self.random = CounterRandom(seed)
+        else:
+            self.random = random.Random(seed) if seed is not None else random
+        self.rng = _require_numpy().random.default_rng(seed) if backend == 'numpy' else None
+        self.references = references or {}
+        self.samplers: Dict[str, UniqueKeySampler] = {}
+        self.uniques: Dict[str, Any] = {}
+        self.distributions: Dict[str, Any] = {}
+        # Values emitted so far by earlier columns that others relate to
+        self.siblings: Dict[str, List[Any]] = {}
+        self.pool_bytes = POOL_BYTES
         self.data: Dict[str, List[Any]] = {col.name: [] for col in columns}
+        self._compile_plan()
+
+    def _compile_plan(self) -> None:
+        # One compiled generator per column, built once so that an
+        # unsupported data_type fails here rather than on the first row
+        self.plan: List[Callable[[], Any]] = []
+        earlier = set()
+        for index, column in enumerate(self.columns):
+            related_to = column.related_to
+            if related_to is not None and related_to not in self.references:
+                if related_to not in earlier:
+                    raise ValueError(f"Column {column.name} relates to {related_to}, which is "
+                                     "neither in references nor an earlier column")
+                self.siblings.setdefault(related_to, [])
+            earlier.add(column.name)
+            if self.counter_based:
+                # Compile-time draws, such as permutation keys, get a stream of their own
+                self.random.seek(index, COMPILE_ROW)
+            self.plan.append(self._compile_column(column))
+        for index, column in enumerate(self.columns):
+            if column.name in self.siblings:
+                self.plan[index] = self._recording(self.plan[index], self.siblings[column.name])
+
+    @staticmethod
+    def _recording(generate: Callable[[], Any], keys: List[Any]) -> Callable[[], Any]:
+        """Wrap a column generator so its non-NULL values are appended to keys."""
+        append = keys.append
+
+        def record() -> Any:
+            value = generate()
+            if value is not None:
+                append(value)
+            return value
+        return record
+
+    def _chars(self, alphabet: str) -> Callable[[int], str]:
+        """
+        take(count) for random characters of alphabet: carved from a
+        CharPool, or drawn per call when counter-based, where no state may
+        carry over from one cell to the next.
+        """
+        if not self.counter_based:
+            return CharPool(self.random, alphabet, self.pool_bytes).take
+        (table, delete), next64 = _byte_translation(alphabet), self.random.next64
+
+        def take(count: int) -> str:
+            text = ''
+            while len(text) < count:
+                text += next64().to_bytes(8, 'little').translate(table, delete).decode('latin-1')
+            return text[:count]
+        return take
     
-    def _generate_string(self, config: ColumnConfig) -> str:
-        """Generate a random string value."""
+    def _compile_string(self, config: ColumnConfig) -> Callable[[], str]:
+        """Compile a random string generator."""
         if config.pattern:
-            return config.pattern
-        length = random.randint(5, 20)
-        return ''.join(random.choices(string.ascii_letters, k=length))
-    
-    def _generate_integer(self, config: ColumnConfig) -> int:
-        """Generate a random integer value."""
+            pattern = config.pattern
+            return lambda: pattern
+        take, length = self._chars(string.ascii_letters), self._chars(_lengths(5, 20))
+        return lambda: take(ord(length(1)))
+
+    def _compile_integer(self, config: ColumnConfig) -> Callable[[], int]:
+        """Compile a random integer generator."""
         min_val = config.min_value if config.min_value is not None else 0
         max_val = config.max_value if config.max_value is not None else 1000
-        return random.randint(min_val, max_val)
-    
-    def _generate_float(self, config: ColumnConfig) -> float:
-        """Generate a random float value."""
+        randint = self.random.randint
+        return lambda: randint(min_val, max_val)
+
+    def _compile_float(self, config: ColumnConfig) -> Callable[[], float]:
+        """Compile a random float generator."""
         min_val = config.min_value if config.min_value is not None else 0.0
         max_val = config.max_value if config.max_value is not None else 1000.0
-        return round(random.uniform(min_val, max_val), 2)
-    
+        uniform = self.random.uniform
+        return lambda: round(uniform(min_val, max_val), 2)
+
+    def _compile_date(self, config: ColumnConfig) -> Callable[[], str]:
+        """Compile a random date generator."""
+        choice, dates = self.random.choice, iso_dates()
+        return lambda: choice(dates)
+
+    def _compile_email(self, config: ColumnConfig) -> Callable[[], str]:
+        """Compile a random email address generator."""
+        take, length = self._chars(string.ascii_lowercase), self._chars(_lengths(5, 10))
+        domain = self._chars(''.join(map(chr, range(len(EMAIL_DOMAINS)))))
+        at_domains = {chr(i): '@' + d for i, d in enumerate(EMAIL_DOMAINS)}
+        return lambda: take(ord(length(1))) + at_domains[domain(1)]
+
+    def _compile_phone(self, config: ColumnConfig) -> Callable[[], str]:
+        """Compile a random phone number generator."""
+        leading, digits = self._chars('123456789'), self._chars(string.digits)
+
+        def generate_phone():
+            # Each part's first digit is non-zero: 100-999, 100-999, 1000-9999
+            firsts, rest = leading(3), digits(7)
+            return f"{firsts[0]}{rest[:2]}-{firsts[1]}{rest[2:4]}-{firsts[2]}{rest[4:]}"
+        return generate_phone
+
+    def _compile_reference(self, config: ColumnConfig) -> Callable[[], Any]:
+        """Compile a generator that samples the keys config.related_to refers to."""
+        if config.related_to not in self.references and config.related_to in self.siblings:
+            return self._compile_sibling_reference(config)
+        keys = self.references.get(config.related_to)
+        if keys is None:
+            raise ValueError(f"Column {config.name} relates to {config.related_to}, "
+                             "which is not in references")
+        if not len(keys):
+            raise ValueError(f"References for {config.related_to} are empty")
+        if config.distribution == 'zipf':
+            rank, draw = self._zipf_sampler(config, len(keys)).rank, self.random.random
+            return lambda: keys[rank(draw)]
+        if not config.unique:
+            choice = self.random.choice
+            return lambda: choice(keys)
+        if self.counter_based:
+            # The row index picks a key position through a permutation
+            at, rng = UniquePermutation(len(keys), self.random).at, self.random
+            return lambda: keys[at(rng.row)]
+        if config.name not in self.samplers:
+            self.samplers[config.name] = UniqueKeySampler(keys)
+        sampler = self.samplers[config.name]
+        draw, fraction = sampler.draw, self.random.random
+        return lambda: draw(fraction())
+
+    def _compile_sibling_reference(self, config: ColumnConfig) -> Callable[[], Any]:
+        """Compile a generator that samples the values an earlier column has produced so far."""
+        if self.counter_based or config.unique or config.distribution != 'uniform':
+            raise ValueError(f"Column {config.name}: relating to the earlier column "
+                             f"{config.related_to} needs sequential, uniform, non-unique sampling")
+        keys, choice = self.siblings[config.related_to], self.random.choice
+        # Until the earlier column has produced a non-NULL value there is nothing to refer to
+        return lambda: choice(keys) if keys else None
+
+    def _unique_range(self, config: ColumnConfig) -> Optional[int]:
+        """Number of distinct values a permutable column can take, else None."""
+        if config.data_type == 'integer':
+            min_val = config.min_value if config.min_value is not None else 0
+            max_val = config.max_value if config.max_value is not None else 1000
+            return max_val - min_val + 1
+        if config.data_type == 'date':
+            return (DATE_END - DATE_START).days + 1
+        if config.data_type == 'phone':
+            return PHONE_NUMBERS
+        return None
+
+    def _compile_unique(self, config: ColumnConfig,
+                        compile_type: Callable[[ColumnConfig], Callable[[], Any]]) -> Callable[[], Any]:
+        """Compile a generator that never repeats a value of the column."""
+        size = self._unique_range(config)
+        if size is not None:
+            if config.name not in self.uniques:
+                self.uniques[config.name] = UniquePermutation(size, self.random)
+            if self.counter_based:
+                at, rng = self.uniques[config.name].at, self.random
+                step: Callable[[], int] = lambda: at(rng.row)
+            else:
+                step = self.uniques[config.name].next
+            if config.data_type == 'integer':
+                min_val = config.min_value if config.min_value is not None else 0
+                return lambda: min_val + step()
+            if config.data_type == 'date':
+                dates = iso_dates()
+                return lambda: dates[step()]
+            return lambda: _format_phone(step())
+
+        if self.counter_based:
+            raise ValueError(f"Column {config.name}: unique {config.data_type} columns "
+                             "cannot be counter-based")
+        unique = self.uniques.setdefault(config.name, UniqueFilter())
+        generate, add = compile_type(config), unique.add
+
+        def generate_unique():
+            for _ in range(unique.max_retries):
+                value = generate()
+                if add(value):
+                    return value
+            raise ValueError(f"Column {config.name} ran out of unique values")
+        return generate_unique
+
+    def _numeric_range(self, config: ColumnConfig) -> Tuple[float, float]:
+        """A numeric column's (min_value, max_value), with the type's defaults."""
+        default = 1000 if config.data_type == 'integer' else 1000.0
+        return (config.min_value if config.min_value is not None else 0,
+                config.max_value if config.max_value is not None else default)
+
+    def _normal_parameters(self, config: ColumnConfig) -> Tuple[float, float]:
+        """(mean, stddev) of a 'normal' column, defaulting to the middle and a sixth of the range."""
+        low, high = self._numeric_range(config)
+        mean = config.mean if config.mean is not None else (low + high) / 2
+        stddev = config.stddev if config.stddev is not None else (high - low) / 6
+        if not stddev > 0:
+            raise ValueError(f"Column {config.name}: normal stddev must be positive")
+        return mean, stddev
+
+    def _truncated_normal(self, config: ColumnConfig) -> Tuple[Callable[[float], float], float, float]:
+        """
+        (inverse, start, width) for a 'normal' column: inverse(start + u *
+        width) maps u in [0, 1) into [min_value, max_value]. A range above
+        the mean is mirrored into the lower tail, where the CDF keeps its
+        precision instead of rounding towards 1.
+        """
+        low, high = self._numeric_range(config)
+        mean, stddev = self._normal_parameters(config)
+        normal = statistics.NormalDist(mean, stddev)
+        inv_cdf = normal.inv_cdf
+        tail_low, tail_high = low, high
+        if low + high > 2 * mean:
+            tail_low, tail_high = 2 * mean - high, 2 * mean - low
+            inv_cdf = lambda p: 2 * mean - normal.inv_cdf(p)
+        start = normal.cdf(tail_low)
+        width = min(normal.cdf(tail_high), 1.0 - 2 ** -53) - start
+        if not width >= NORMAL_MIN_MASS:
+            raise ValueError(f"Column {config.name}: range holds too little of the normal "
+                             "distribution to sample")
+        # Clamp what inv_cdf's rounding lets slip past either end
+        return lambda p: min(max(inv_cdf(p), low), high), max(start, sys.float_info.min), width
+
+    def _exponential_parameters(self, config: ColumnConfig) -> Tuple[float, float]:
+        """
+        (scale, span) of an 'exponential' column: values are min_value plus
+        an exponential of mean scale, and span is the CDF at max_value.
+        The mean defaults to a quarter of the way into the range.
+        """
+        low, high = self._numeric_range(config)
+        mean = config.mean if config.mean is not None else low + (high - low) / 4
+        if mean <= low:
+            raise ValueError(f"Column {config.name}: exponential mean must exceed min_value")
+        return mean - low, -math.expm1(-(high - low) / (mean - low))
+
+    def _zipf_sampler(self, config: ColumnConfig, count: int) -> ZipfSampler:
+        """Build the column's ZipfSampler and keep it for the numpy backend."""
+        sampler = self.distributions[config.name] = ZipfSampler(count, config.exponent)
+        return sampler
+
+    def _check_distribution(self, config: ColumnConfig) -> None:
+        """Reject distribution settings that cannot apply to the column."""
+        distribution = config.distribution
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unsupported distribution: {distribution}")
+        if distribution == 'uniform':
+            return
+        if config.unique:
+            raise ValueError(f"Column {config.name}: unique requires a uniform distribution")
+        if distribution == 'weighted':
+            if config.related_to is not None:
+                raise ValueError(f"Column {config.name}: 'weighted' draws from choices, "
+                                 "not related_to keys")
+            if not config.choices:
+                raise ValueError(f"Column {config.name}: 'weighted' requires choices")
+            if config.weights is not None and len(config.weights) != len(config.choices):
+                raise ValueError(f"Column {config.name}: weights and choices differ in length")
+        elif distribution == 'zipf':
+            if not (config.choices or config.related_to is not None or config.data_type == 'integer'):
+                raise ValueError(f"Column {config.name}: 'zipf' requires choices, related_to "
+                                 "or an integer column")
+        elif config.data_type not in ('integer', 'float') or config.related_to is not None:
+            raise ValueError(f"Column {config.name}: '{distribution}' requires an integer or "
+                             "float column")
+
+    def _compile_distribution(self, config: ColumnConfig) -> Callable[[], Any]:
+        """Compile a generator that draws from config.distribution."""
+        draw = self.random.random
+        if config.distribution == 'weighted':
+            choices = list(config.choices)
+            table = AliasTable(config.weights or [1.0] * len(choices))
+            self.distributions[config.name] = table
+            index = table.index
+            return lambda: choices[index(draw())]
+
+        if config.distribution == 'zipf':
+            if config.choices:
+                choices = list(config.choices)
+                rank = self._zipf_sampler(config, len(choices)).rank
+                return lambda: choices[rank(draw)]
+            min_val, max_val = self._numeric_range(config)
+            rank = self._zipf_sampler(config, max_val - min_val + 1).rank
+            return lambda: min_val + rank(draw)
+
+        low, high = self._numeric_range(config)
+        # round(x, None) is an int, matching the uniform integer and float columns
+        digits = None if config.data_type == 'integer' else 2
+        if config.distribution == 'normal':
+            # Inverse CDF over the slice of [0, 1) that maps into [low, high]
+            inverse, start, width = self._truncated_normal(config)
+            return lambda: round(inverse(start + draw() * width), digits)
+
+        # Exponential above low, truncated at high, by inverse CDF
+        scale, span = self._exponential_parameters(config)
+        log1p = math.log1p
+        return lambda: round(low - scale * log1p(-draw() * span), digits)
+
+    def _compile_column(self, config: ColumnConfig) -> Callable[[], Any]:
+        """
+        Compile a column's configuration into a zero-argument callable that
+        generates one value, with its defaults and RNG methods bound once.
+        Columns that can be NULL are wrapped in a NULL check; columns with
+        a null_probability of zero skip it entirely.
+        """
+        compilers = {
+            'string': self._compile_string,
+            'integer': self._compile_integer,
+            'float': self._compile_float,
+            'date': self._compile_date,
+            'email': self._compile_email,
+            'phone': self._compile_phone
+        }
+
+        compile_type = compilers.get(config.data_type)
+        if not compile_type:
+            raise ValueError(f"Unsupported data type: {config.data_type}")
+        self._check_distribution(config)
+
+        if config.related_to is not None:
+            generate = self._compile_reference(config)
+        elif config.distribution != 'uniform':
+            generate = self._compile_distribution(config)
+        elif config.unique:
+            generate = self._compile_unique(config, compile_type)
+        else:
+            generate = compile_type(config)
+        null_probability = config.null_probability
+        if not null_probability:
+            return generate
+        draw = self.random.random
+        return lambda: None if draw() < null_probability else generate()
+
+    def _one_value(self, compile_value: Callable[[ColumnConfig], Callable[[], Any]],
+                   config: ColumnConfig) -> Any:
+        """Compile config with pools sized for one value, and generate that value."""
+        self.pool_bytes = ONE_VALUE_POOL_BYTES
+        try:
+            return compile_value(config)()
+        finally:
+            self.pool_bytes = POOL_BYTES
+
+    def _generate_value(self, config: ColumnConfig) -> Any:
+        """Generate a single value for a column configuration outside the plan."""
+        return self._one_value(self._compile_column, config)
+
+    def _generate_string(self, config: ColumnConfig) -> str:
+        """Generate a single random string."""
+        return self._one_value(self._compile_string, config)
+
+    def _generate_integer(self, config: ColumnConfig) -> int:
+        """Generate a single random integer."""
+        return self._compile_integer(config)()
+
+    def _generate_float(self, config: ColumnConfig) -> float:
+        """Generate a single random float."""
+        return self._compile_float(config)()
+
     def _generate_date(self, config: ColumnConfig) -> str:
-        """Generate a random date value."""
-        start_date = datetime.date(2000, 1, 1)
-        end_date = datetime.date(2023, 12, 31)
-        days_between = (end_date - start_date).days
-        random_days = random.randint(0, days_between)
-        random_date = start_date + datetime.timedelta(days=random_days)
-        return random_date.isoformat()
-    
+        """Generate a single random date."""
+        return self._compile_date(config)()
+
     def _generate_email(self, config: ColumnConfig) -> str:
-        """Generate a random email address."""
-        domains = ['example.com', 'test.org', 'sample.net']
-        name_length = random.randint(5, 10)
-        name = ''.join(random.choices(string.ascii_lowercase, k=name_length))
-        domain = random.choice(domains)
-        return f"{name}@{domain}"
-    
+        """Generate a single random email address."""
+        return self._one_value(self._compile_email, config)
+
     def _generate_phone(self, config: ColumnConfig) -> str:
-        """Generate a random phone number."""
-        area_code = random.randint(100, 999)
-        prefix = random.randint(100, 999)
-        line = random.randint(1000, 9999)
-        return f"{area_code}-{prefix}-{line}"
-    
-    def _generate_value(self, config: ColumnConfig) -> Any:
-        """Generate a value based on the column configuration."""
-        if random.random() < config.null_probability:
-            return None
-            
-        generators = {
-            'string': self._generate_string,
-            'integer': self._generate_integer,
-            'float': self._generate_float,
-            'date': self._generate_date,
-            'email': self._generate_email,
-            'phone': self._generate_phone
-        }
-        
-        generator = generators.get(config.data_type)
-        if not generator:
-            raise ValueError(f"Unsupported data type: {config.data_type}")
-            
-        return generator(config)
-    
+        """Generate a single random phone number."""
+        return self._one_value(self._compile_phone, config)
+
+    def _carve_strings(self, alphabet: str, lengths: Any) -> List[str]:
+        """Cut strings of the given lengths out of one random buffer of alphabet characters."""
+        np = _require_numpy()
+        symbols = np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)
+        buffer = symbols[self.rng.integers(0, len(symbols), int(lengths.sum()))]
+        text = buffer.tobytes().decode('ascii')
+        ends = np.cumsum(lengths).tolist()
+        starts = [0] + ends[:-1]
+        return [text[start:end] for start, end in zip(starts, ends)]
+
+    def _sample_keys_numpy(self, config: ColumnConfig, num_rows: int) -> List[Any]:
+        """Sample num_rows keys for a related_to column in one batch."""
+        keys = self.references.get(config.related_to)
+        if keys is None:
+            keys = self.siblings[config.related_to]
+            if not keys:
+                return [None] * num_rows
+        sampler = self.samplers.get(config.name)
+        if sampler is not None:
+            return [sampler.draw(fraction) for fraction in self.rng.random(num_rows).tolist()]
+        if config.distribution == 'zipf':
+            positions = self.distributions[config.name].rank_array(self.rng, num_rows)
+        else:
+            positions = self.rng.integers(0, len(keys), num_rows)
+        if isinstance(keys, _require_numpy().ndarray):
+            return keys[positions].tolist()
+        return [keys[i] for i in positions.tolist()]
+
+    def _iso_dates(self, offsets: Any) -> List[str]:
+        """Look day offsets from DATE_START up in the ISO date table."""
+        return _iso_date_array()[offsets].tolist()
+
+    def _phones(self, parts: Any) -> List[str]:
+        """Format (area code, prefix, line) arrays as NNN-NNN-NNNN strings."""
+        np = _require_numpy()
+        # Lay the digits of NNN-NNN-NNNN out as ASCII bytes, 12 per row
+        digits = np.empty((len(parts[0]), 12), dtype=np.uint8)
+        for start, width, part in zip((0, 4, 8), (3, 3, 4), parts):
+            for i in range(width):
+                digits[:, start + width - 1 - i] = part % 10 + ord('0')
+                part //= 10
+        digits[:, 3] = digits[:, 7] = ord('-')
+        return digits.view('S12').ravel().astype('U12').tolist()
+
+    def _generate_values_numpy(self, config: ColumnConfig, num_rows: int) -> List[Any]:
+        """Generate num_rows values of a column's data type in one vectorized batch."""
+        np = _require_numpy()
+        rng = self.rng
+        data_type = config.data_type
+        if data_type == 'string':
+            if config.pattern:
+                return [config.pattern] * num_rows
+            return self._carve_strings(string.ascii_letters, rng.integers(5, 21, num_rows))
+        if data_type == 'integer':
+            min_val = config.min_value if config.min_value is not None else 0
+            max_val = config.max_value if config.max_value is not None else 1000
+            return rng.integers(min_val, max_val, num_rows, endpoint=True).tolist()
+        if data_type == 'float':
+            min_val = config.min_value if config.min_value is not None else 0.0
+            max_val = config.max_value if config.max_value is not None else 1000.0
+            return np.round(rng.uniform(min_val, max_val, num_rows), 2).tolist()
+        if data_type == 'date':
+            days_between = (DATE_END - DATE_START).days
+            return self._iso_dates(rng.integers(0, days_between, num_rows, endpoint=True))
+        if data_type == 'email':
+            names = self._carve_strings(string.ascii_lowercase, rng.integers(5, 11, num_rows))
+            domains = rng.integers(0, len(EMAIL_DOMAINS), num_rows).tolist()
+            return [f"{name}@{EMAIL_DOMAINS[d]}" for name, d in zip(names, domains)]
+        if data_type == 'phone':
+            return self._phones([rng.integers(low, high, num_rows, endpoint=True)
+                                 for low, high in ((100, 999), (100, 999), (1000, 9999))])
+        raise ValueError(f"Unsupported data type: {data_type}")
+
+    def _distribution_values_numpy(self, config: ColumnConfig, num_rows: int) -> List[Any]:
+        """Draw num_rows values of a non-uniform column in one vectorized batch."""
+        np = _require_numpy()
+        rng = self.rng
+        sampler = self.distributions.get(config.name)
+        if config.distribution == 'weighted':
+            choices = config.choices
+            return [choices[i] for i in sampler.index_array(rng.random(num_rows)).tolist()]
+        if config.distribution == 'zipf':
+            ranks = sampler.rank_array(rng, num_rows)
+            if config.choices:
+                return [config.choices[i] for i in ranks.tolist()]
+            return (ranks + self._numeric_range(config)[0]).tolist()
+
+        low, high = self._numeric_range(config)
+        if config.distribution == 'normal':
+            inverse, start, width = self._truncated_normal(config)
+            if width < REJECTION_MIN_MASS:
+                # Redrawing would take about 1 / width rounds
+                values = np.array([inverse(p) for p in (start + rng.random(num_rows) * width).tolist()])
+            else:
+                mean, stddev = self._normal_parameters(config)
+                values = rng.normal(mean, stddev, num_rows)
+                # Redraw the values outside [low, high] until none are left
+                outside = (values < low) | (values > high)
+                while outside.any():
+                    values[outside] = rng.normal(mean, stddev, int(outside.sum()))
+                    outside = (values < low) | (values > high)
+        else:
+            scale, span = self._exponential_parameters(config)
+            values = low - scale * np.log1p(-rng.random(num_rows) * span)
+        if config.data_type == 'integer':
+            return np.rint(values).astype(np.int64).tolist()
+        return np.round(values, 2).tolist()
+
+    def _permuted_values_numpy(self, config: ColumnConfig, offsets: Any) -> List[Any]:
+        """Map UniquePermutation outputs to values of the column's data type."""
+        if config.data_type == 'integer':
+            min_val = config.min_value if config.min_value is not None else 0
+            return [min_val + offset for offset in offsets.tolist()]
+        if config.data_type == 'date':
+            return self._iso_dates(offsets)
+        area_codes, rest = offsets // (900 * 9000), offsets % (900 * 9000)
+        return self._phones([area_codes + 100, rest // 9000 + 100, rest % 9000 + 1000])
+
+    def _filtered_values_numpy(self, config: ColumnConfig, unique: UniqueFilter,
+                               num_rows: int) -> List[Any]:
+        """Generate batches until num_rows values have passed the column's UniqueFilter."""
+        values: List[Any] = []
+        add = unique.add
+        for _ in range(unique.max_retries):
+            values.extend(v for v in self._generate_values_numpy(config, num_rows - len(values))
+                          if add(v))
+            if len(values) == num_rows:
+                return values
+        raise ValueError(f"Column {config.name} ran out of unique values")
+
+    def _generate_column_numpy(self, config: ColumnConfig, num_rows: int) -> List[Any]:
+        """Generate a whole column in one vectorized batch."""
+        np = _require_numpy()
+        unique = self.uniques.get(config.name)
+        if config.related_to is not None:
+            values = self._sample_keys_numpy(config, num_rows)
+        elif config.distribution != 'uniform':
+            values = self._distribution_values_numpy(config, num_rows)
+        elif isinstance(unique, UniquePermutation):
+            values = self._permuted_values_numpy(config, unique.next_array(num_rows))
+        elif isinstance(unique, UniqueFilter):
+            values = self._filtered_values_numpy(config, unique, num_rows)
+        else:
+            values = self._generate_values_numpy(config, num_rows)
+
+        if config.null_probability > 0:
+            for i in np.flatnonzero(self.rng.random(num_rows) < config.null_probability).tolist():
+                values[i] = None
+        if config.name in self.siblings:
+            self.siblings[config.name].extend(v for v in values if v is not None)
+        return values
+
+    def _generate_columns(self, num_rows: int) -> Dict[str, List[Any]]:
+        """Generate the next num_rows rows as a dict of column lists."""
+        start = self.next_row
+        self.next_row += num_rows
+        if self.backend == 'numpy':
+            return {column.name: self._generate_column_numpy(column, num_rows)
+                    for column in self.columns}
+        if self.counter_based:
+            return self._generate_row_range(start, start + num_rows)
+        columns: Dict[str, List[Any]] = {column.name: [] for column in self.columns}
+        steps = [(columns[column.name].append, generate)
+                 for column, generate in zip(self.columns, self.plan)]
+        # Row by row, so the values do not depend on how rows are batched
+        for _ in range(num_rows):
+            for append, generate in steps:
+                append(generate())
+        return columns
+
+    def _generate_row_range(self, start: int, stop: int) -> Dict[str, List[Any]]:
+        """Generate rows start..stop-1 of a counter-based generator as column lists."""
+        columns: Dict[str, List[Any]] = {column.name: [] for column in self.columns}
+        steps = [(index, columns[column.name].append, generate)
+                 for index, (column, generate) in enumerate(zip(self.columns, self.plan))]
+        seek = self.random.seek
+        for row in range(start, stop):
+            for index, append, generate in steps:
+                seek(index, row)
+                append(generate())
+        return columns
+
+    def rows(self, start: int, stop: int) -> List[Tuple[Any, ...]]:
+        """
+        Return rows start..stop-1 as row tuples, computed from scratch and
+        without moving next_row. Needs counter_based=True.
+        """
+        if not self.counter_based:
+            raise ValueError("Random access to rows needs counter_based=True")
+        columns = self._generate_row_range(start, stop)
+        return list(zip(*(columns[column.name] for column in self.columns)))
+
+    def virtual(self, num_rows: int) -> 'VirtualDataset':
+        """Return a read-only sequence of num_rows rows generated on access. Needs counter_based=True."""
+        if not self.counter_based:
+            raise ValueError("A virtual dataset needs counter_based=True")
+        return VirtualDataset(self, num_rows)
+
     def generate_data(self, num_rows: int) -> None:
         """Generate the specified number of rows of test data."""
-        for _ in range(num_rows):
-            for column in self.columns:
-                value = self._generate_value(column)
-                self.data[column.name].append(value)
-    
+        for name, values in self._generate_columns(num_rows).items():
+            self.data[name].extend(values)
+
+    def iter_batches(self, num_rows: int,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Tuple[Any, ...]]]:
+        """
+        Yield num_rows rows in batches of at most batch_size row tuples,
+        without storing them in self.data, so memory stays bounded by
+        the batch size.
+        """
+        remaining = num_rows
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            yield self._generate_rows(size)
+            remaining -= size
+
+    def _generate_rows(self, num_rows: int) -> List[Tuple[Any, ...]]:
+        """Generate num_rows rows as a list of row tuples."""
+        columns = self._generate_columns(num_rows)
+        return list(zip(*(columns[column.name] for column in self.columns)))
+
+    def stream(self, rate: float, batch_size: Optional[int] = None,
+               num_rows: Optional[int] = None) -> 'RowStream':
+        """
+        Return an async iterator of row batches paced to rate rows per
+        second, endless unless num_rows is given. batch_size defaults to
+        a twentieth of a second's worth of rows.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, not {rate}")
+        if batch_size is None:
+            batch_size = min(DEFAULT_BATCH_SIZE, max(1, int(rate / 20)))
+        return RowStream(self, rate, batch_size, num_rows)
+
     def save_to_csv(self, filepath: str) -> None:
         """Save the generated data to a CSV file."""
         with open(filepath, 'w', newline='') as csvfile:
@@ -112,9 +1204,478 @@ class TestDataGenerator:
             # Write header
             writer.writerow([col.name for col in self.columns])
             # Write data rows
-            for i in range(len(self.data[self.columns[0].name])):
-                row = [self.data[col.name][i] for col in self.columns]
-                writer.writerow(row)
+            writer.writerows(zip(*(self.data[col.name] for col in self.columns)))
+
+    def _write_rows(self, csvfile: Any, num_rows: int, batch_size: int, header: bool = True) -> None:
+        writer = csv.writer(csvfile)
+        if header:
+            writer.writerow([col.name for col in self.columns])
+        for batch in self.iter_batches(num_rows, batch_size):
+            writer.writerows(batch)
+
+    def save_to_npy(self, directory: str) -> List[str]:
+        """
+        Save each column of self.data as directory/<column>.npy, without
+        needing NumPy. Integers are int64, floats float64, dates
+        datetime64[D] and all other types fixed-width unicode. Columns
+        containing NULLs also get a <column>.mask.npy boolean array that is
+        True where the value is NULL. Returns the paths written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for column in self.columns:
+            values = self.data[column.name]
+            path = os.path.join(directory, column.name + '.npy')
+            with open(path, 'wb') as f:
+                f.write(_npy_column(column.data_type, values))
+            paths.append(path)
+            if any(v is None for v in values):
+                mask_path = os.path.join(directory, column.name + '.mask.npy')
+                with open(mask_path, 'wb') as f:
+                    f.write(_npy_bytes('|b1', len(values), bytes(v is None for v in values)))
+                paths.append(mask_path)
+        return paths
+
+    def to_arrow(self, dictionary: bool = False) -> Any:
+        """
+        Return self.data as a pyarrow Table, one typed array per column.
+
+        With dictionary=True, text columns with at most
+        DICTIONARY_MAX_RATIO distinct values per row are dictionary
+        encoded, storing each distinct value once plus an index per row.
+        """
+        pa = _require_pyarrow()
+        arrays = []
+        for column in self.columns:
+            values = self.data[column.name]
+            if column.data_type == 'integer':
+                arrays.append(pa.array(values, type=pa.int64()))
+            elif column.data_type == 'float':
+                arrays.append(pa.array(values, type=pa.float64()))
+            elif column.data_type == 'date':
+                arrays.append(pa.array(values, type=pa.string()).cast(pa.date32()))
+            else:
+                text = pa.array(values, type=pa.string())
+                if dictionary:
+                    encoded = text.dictionary_encode()
+                    if len(encoded.dictionary) <= len(text) * DICTIONARY_MAX_RATIO:
+                        text = encoded
+                arrays.append(text)
+        return pa.Table.from_arrays(arrays, names=[col.name for col in self.columns])
+
+    def save_to_arrow(self, filepath: str, dictionary: bool = False) -> None:
+        """Save the generated data as an Arrow IPC file (requires pyarrow)."""
+        pa = _require_pyarrow()
+        table = self.to_arrow(dictionary)
+        with pa.OSFile(filepath, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def save_to_parquet(self, filepath: str, compression: str = 'snappy',
+                        dictionary: bool = False) -> None:
+        """Save the generated data as a Parquet file (requires pyarrow)."""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(dictionary), filepath, compression=compression)
+
+    def _load_sqlite(self, filepath: str, table: str, batches: Iterable[List[Tuple[Any, ...]]],
+                     indexes: Sequence[str]) -> None:
+        """Create table from the column types and bulk insert batches into it."""
+        names = [col.name for col in self.columns]
+        missing = [name for name in indexes if name not in names]
+        if missing:
+            raise ValueError(f"Cannot index unknown columns: {', '.join(missing)}")
+        quoted = _quote_identifier(table)
+        definitions = ', '.join(f"{_quote_identifier(col.name)} {SQLITE_TYPES.get(col.data_type, 'TEXT')}"
+                                for col in self.columns)
+        insert = f"INSERT INTO {quoted} VALUES ({', '.join('?' * len(names))})"
+
+        connection = sqlite3.connect(filepath, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"DROP TABLE IF EXISTS {quoted}")
+            connection.execute(f"CREATE TABLE {quoted} ({definitions})")
+            for batch in batches:
+                connection.execute("BEGIN")
+                connection.executemany(insert, batch)
+                connection.execute("COMMIT")
+            # Indexes are cheaper to build once over the loaded rows
+            unique = {col.name for col in self.columns if col.unique}
+            for name in indexes:
+                kind = "UNIQUE INDEX" if name in unique else "INDEX"
+                index = _quote_identifier(f"{table}_{name}_idx")
+                connection.execute(f"CREATE {kind} {index} ON {quoted} ({_quote_identifier(name)})")
+        finally:
+            connection.close()
+
+    def save_to_sqlite(self, filepath: str, table: str = 'data', indexes: Sequence[str] = (),
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """
+        Save the generated data to a table in a SQLite database, replacing
+        any table of that name. Columns are INTEGER, REAL or TEXT by
+        data_type. Rows go in with executemany, batch_size rows per
+        transaction, in WAL mode with synchronous=NORMAL; the columns in
+        indexes are indexed after loading (UNIQUE for unique columns).
+        """
+        rows = zip(*(self.data[col.name] for col in self.columns))
+        batches = iter(lambda: list(itertools.islice(rows, batch_size)), [])
+        self._load_sqlite(filepath, table, batches, indexes)
+
+    def write_sqlite(self, filepath: str, num_rows: int, table: str = 'data',
+                     indexes: Sequence[str] = (), batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """Generate num_rows rows straight into SQLite like save_to_sqlite, in constant memory."""
+        self._load_sqlite(filepath, table, self.iter_batches(num_rows, batch_size), indexes)
+
+    def write_csv(self, filepath: str, num_rows: int,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """
+        Generate num_rows rows straight into a CSV file, one batch at a
+        time, in constant memory.
+        """
+        with open(filepath, 'w', newline='') as csvfile:
+            self._write_rows(csvfile, num_rows, batch_size)
+
+    def write_csv_sharded(self, filepath: str, num_rows: int, shards: int,
+                          processes: Optional[int] = None, merge: bool = True,
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> List[str]:
+        """
+        Generate num_rows rows on a process pool, split into shards parts.
+
+        Shard i is generated by its own generator seeded with
+        shard_seed(seed, i, next_row), so for a given seed and shard count
+        the output is byte-identical however many processes run it, and a
+        second call continues with new rows like write_csv would. With merge=True the
+        shards are concatenated in order into filepath under one header;
+        otherwise each shard is left as filepath.partNNNN with its own
+        header. Returns the paths written. Without a seed one is drawn at
+        random so shards still get independent streams.
+
+        Unique columns stay unique across shards and with the parent's own
+        rows: unique related_to columns draw num_rows keys from the
+        parent's sampler and deal each shard a run of them; permuted
+        columns give each shard its own run of the parent's permutation;
+        and filtered columns give each shard the values whose hash falls
+        in its partition, merging the shards' filters back afterwards.
+
+        A counter-based generator needs none of this: each shard computes
+        its own range of rows, so the output is byte-identical to
+        write_csv.
+        """
+        seed = self.seed if self.seed is not None else random.getrandbits(64)
+        shard_paths = [f"{filepath}.part{shard:04d}" for shard in range(shards)]
+        sizes = shard_sizes(num_rows, shards)
+        # Keys drawn here are used up in the parent, whichever shard gets them
+        dealt = {} if self.counter_based else {
+            name: [sampler.draw(self.random.random()) for _ in range(num_rows)]
+            for name, sampler in self.samplers.items()}
+
+        def shard_arguments(shard: int) -> Tuple[Any, ...]:
+            offset = sum(sizes[:shard])
+            start_row = self.next_row + offset
+            if self.counter_based:
+                return seed, {}, True, start_row, {}
+            uniques = {name: unique.for_shard(offset)
+                       if isinstance(unique, UniquePermutation) else unique.for_shard(shard, shards)
+                       for name, unique in self.uniques.items()}
+            samplers = {name: UniqueKeySampler(keys[offset:offset + sizes[shard]])
+                        for name, keys in dealt.items()}
+            return shard_seed(seed, shard, self.next_row), uniques, False, start_row, samplers
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = []
+            for shard, (path, rows) in enumerate(zip(shard_paths, sizes)):
+                worker_seed, uniques, counter_based, start_row, samplers = shard_arguments(shard)
+                futures.append(executor.submit(
+                    _write_shard, self.columns, self.backend, worker_seed, path, rows, batch_size,
+                    not merge, self.references, uniques, counter_based, start_row, samplers))
+            filters = [future.result()[1] for future in futures]
+        self.next_row += num_rows
+        for name, unique in self.uniques.items():
+            if isinstance(unique, UniquePermutation):
+                unique.position += num_rows
+            else:
+                unique.merge([shard_filters[name] for shard_filters in filters])
+        if not merge:
+            return shard_paths
+
+        with open(filepath, 'w', newline='') as csvfile:
+            csv.writer(csvfile).writerow([col.name for col in self.columns])
+        with open(filepath, 'ab') as merged:
+            for path in shard_paths:
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, merged)
+                os.remove(path)
+        return [filepath]
+
+@dataclass
+class StreamStats:
+    """Progress of a RowStream; lag is how far behind schedule the last batch was requested."""
+    rows: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    lag: float = 0.0
+    max_lag: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Achieved rows per second."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class RowStream:
+    """
+    Async iterator of row batches from a TestDataGenerator at a target rate.
+
+    Batch k is due once the rows before it would have taken rate to send;
+    an early request waits until then, a late one is served at once and
+    its lateness recorded as lag. Nothing is generated until the consumer
+    asks for the next batch, so a slow consumer or sink holds the producer
+    back instead of letting rows queue up. Batches are generated in a
+    worker thread so the event loop stays responsive.
+    """
+
+    def __init__(self, generator: TestDataGenerator, rate: float, batch_size: int,
+                 num_rows: Optional[int] = None):
+        self.generator = generator
+        self.rate = rate
+        self.batch_size = batch_size
+        self.num_rows = num_rows
+        self.stats = StreamStats()
+        self.start: Optional[float] = None
+
+    def __aiter__(self) -> 'RowStream':
+        return self
+
+    async def __anext__(self) -> List[Tuple[Any, ...]]:
+        stats = self.stats
+        size = self.batch_size
+        if self.num_rows is not None:
+            size = min(size, self.num_rows - stats.rows)
+            if size <= 0:
+                raise StopAsyncIteration
+        # Imported here so that loading the module does not pull in asyncio
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self.start is None:
+            self.start = loop.time()
+        due = self.start + stats.rows / self.rate
+        now = loop.time()
+        if due > now:
+            await asyncio.sleep(due - now)
+            stats.lag = 0.0
+        else:
+            stats.lag = now - due
+            stats.max_lag = max(stats.max_lag, stats.lag)
+        batch = await loop.run_in_executor(None, self.generator._generate_rows, size)
+        stats.rows += size
+        stats.batches += 1
+        stats.elapsed = loop.time() - self.start
+        return batch
+
+    async def pipe(self, sink: Any) -> StreamStats:
+        """Send every batch to sink, waiting for it to accept each one, and return the stats."""
+        await sink.open([col.name for col in self.generator.columns])
+        try:
+            async for batch in self:
+                await sink.send(batch)
+        finally:
+            await sink.close()
+        return self.stats
+
+
+def _csv_bytes(rows: Iterable[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+class SocketSink:
+    """Streams rows as CSV, header first, over TCP (host and port) or a Unix socket (path)."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 path: Optional[str] = None):
+        if (path is None) == (port is None):
+            raise ValueError("Give either host and port or a Unix socket path")
+        self.host = host or 'localhost'
+        self.port = port
+        self.path = path
+        self.writer: Optional['asyncio.StreamWriter'] = None
+
+    async def open(self, header: List[str]) -> None:
+        import asyncio
+        if self.path is not None:
+            _, self.writer = await asyncio.open_unix_connection(self.path)
+        else:
+            _, self.writer = await asyncio.open_connection(self.host, self.port)
+        await self.send([header])
+
+    async def send(self, rows: List[Sequence[Any]]) -> None:
+        self.writer.write(_csv_bytes(rows))
+        # Blocks while the socket's buffers are full: the backpressure
+        await self.writer.drain()
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+
+class HttpSink:
+    """
+    POSTs each batch as a text/csv body, header row included, to an
+    http:// URL over one keep-alive connection, reading back responses
+    framed by Content-Length or chunked encoding. A non-2xx or malformed
+    response raises ConnectionError.
+    """
+
+    def __init__(self, url: str):
+        import urllib.parse
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.header: List[str] = []
+        self.reader: Optional['asyncio.StreamReader'] = None
+        self.writer: Optional['asyncio.StreamWriter'] = None
+
+    async def open(self, header: List[str]) -> None:
+        self.header = header
+
+    async def send(self, rows: List[Sequence[Any]]) -> None:
+        import asyncio
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = _csv_bytes([self.header, *rows])
+        self.writer.write(f"POST {self.target} HTTP/1.1\r\n"
+                          f"Host: {self.host}:{self.port}\r\n"
+                          "Content-Type: text/csv\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+        await self.writer.drain()
+
+        try:
+            status, headers = await self._read_head()
+            if 'chunked' in headers.get('transfer-encoding', '').lower():
+                await self._read_chunked()
+            elif 'content-length' in headers:
+                await self.reader.readexactly(int(headers['content-length']))
+            elif status not in (204, 304):
+                # Without a length the response body runs to the end of the connection
+                await self.reader.read()
+                headers['connection'] = 'close'
+        except ConnectionError:
+            await self.close()
+            raise
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            await self.close()
+            raise ConnectionError(f"{self.url} sent a malformed response: {e}") from e
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        if not 200 <= status < 300:
+            raise ConnectionError(f"{self.url} answered HTTP {status}")
+
+    async def _read_head(self) -> Tuple[int, Dict[str, str]]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError(f"{self.url} closed the connection")
+        parts = status_line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b'HTTP/') or not parts[1].isdigit():
+            raise ValueError(f"bad status line {status_line!r}")
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return int(parts[1]), headers
+
+    async def _read_chunked(self) -> None:
+        while True:
+            line = await self.reader.readline()
+            size = int(line.split(b';', 1)[0], 16)
+            if size == 0:
+                break
+            await self.reader.readexactly(size + 2)
+        # Trailer fields, if any, end with an empty line
+        while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = self.reader = None
+
+
+class VirtualDataset(collections.abc.Sequence):
+    """
+    A read-only sequence of the rows of a counter-based TestDataGenerator.
+    Rows are generated when indexed or iterated and never stored, so a
+    dataset of any length costs nothing until it is read, and any slice
+    can be regenerated on its own.
+    """
+
+    def __init__(self, generator: TestDataGenerator, num_rows: int):
+        self.generator = generator
+        self.num_rows = num_rows
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.num_rows)
+            if step == 1:
+                return self.generator.rows(start, max(start, stop))
+            return [self.generator.rows(i, i + 1)[0] for i in range(start, stop, step)]
+        if index < 0:
+            index += self.num_rows
+        if not 0 <= index < self.num_rows:
+            raise IndexError("VirtualDataset index out of range")
+        return self.generator.rows(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        for start in range(0, self.num_rows, DEFAULT_BATCH_SIZE):
+            yield from self.generator.rows(start, min(start + DEFAULT_BATCH_SIZE, self.num_rows))
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote a table, column or index name for SQLite."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _format_phone(number: int) -> str:
+    """Format a number in range(PHONE_NUMBERS) as a NNN-NNN-NNNN phone number."""
+    area_code, rest = divmod(number, 900 * 9000)
+    prefix, line = divmod(rest, 9000)
+    return f"{area_code + 100}-{prefix + 100}-{line + 1000}"
+
+
+def _npy_column(data_type: str, values: List[Any]) -> bytes:
+    """Encode one column as .npy bytes, with None stored as 0, NaN, NaT or ''."""
+    if data_type == 'integer':
+        return _npy_bytes('<i8', len(values), _little_endian(
+            array('q', [0 if v is None else v for v in values])))
+    if data_type == 'float':
+        return _npy_bytes('<f8', len(values), _little_endian(
+            array('d', [float('nan') if v is None else v for v in values])))
+    if data_type == 'date':
+        epoch = datetime.date(1970, 1, 1).toordinal()
+        nat = -2 ** 63
+        days = array('q', [nat if v is None else datetime.date.fromisoformat(v).toordinal() - epoch
+                           for v in values])
+        return _npy_bytes('<M8[D]', len(values), _little_endian(days))
+    # Everything else is text: fixed-width UTF-32 code units, zero padded
+    texts = ['' if v is None else str(v) for v in values]
+    width = max((len(t) for t in texts), default=0) or 1
+    payload = ''.join(t.ljust(width, '\0') for t in texts).encode('utf-32-le')
+    return _npy_bytes(f'<U{width}', len(values), payload)
+
 
 def main():
     """Example usage of the TestDataGenerator."""
@@ -1,102 +1,875 @@
 import os
 import argparse
-from reportlab.pdfgen import canvas
+import importlib
+import sys
+import time
+import warnings
+import queue
+import threading
+from itertools import islice
+from array import array
+from collections import deque
+from contextlib import contextmanager
 import json
-import yaml
-from jinja2 import Template
+
+
+# Third-party modules backing individual output formats. They are imported
+# on first use so a txt or json run never pays for reportlab, yaml or jinja2
+BACKEND_MODULES = {
+    'pdf': 'reportlab.pdfgen.canvas',
+    'yaml': 'yaml',
+    'html': 'jinja2',
+}
+
+
+def load_backend(format):
+    """Import and return the module backing format."""
+    return importlib.import_module(BACKEND_MODULES[format])
+
+
+def scan_directory(path):
+    """
+    List a single directory with os.scandir, skipping hidden entries.
+    Returns (subdirs, files, walkable) where walkable are the subdirs that
+    are not symlinks, mirroring os.walk's defaults. Returns None if the
+    directory cannot be read. Type information comes from the DirEntry,
+    so no extra stat calls are made for regular entries.
+    """
+    subdirs, files, walkable = [], [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if is_hidden(entry.name):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry.name)
+                    if not entry.is_symlink():
+                        walkable.append(entry.name)
+                else:
+                    files.append(entry.name)
+    except OSError:
+        return None
+    return subdirs, files, walkable
+
+
+def iter_directory_structure(startpath, max_depth, scan=scan_directory):
+    """
+    Yield the entries of generate_directory_structure one directory at a
+    time, as soon as each directory has been scanned. scan lists a single
+    directory and defaults to scan_directory.
+    """
+    # Depth-first, top-down like os.walk; each pending directory carries
+    # its own level so nothing below max_depth is ever scanned
+    pending = [(startpath, 0)]
+    while pending:
+        path, level = pending.pop()
+        listing = scan(path)
+        if listing is None:
+            continue
+        subdirs, files, walkable = listing
+
+        if level > 0 or not is_hidden(os.path.basename(path)):  # Skip hidden root
+            yield {'dir': os.path.basename(path), 'level': level,
+                   'files': files, 'subdirs': subdirs}
+        if max_depth == -1 or level < max_depth:
+            pending.extend((os.path.join(path, d), level + 1)
+                           for d in reversed(walkable))
 
 
 def generate_directory_structure(startpath, max_depth):
-    structure = []
-    start_level = startpath.count(os.sep)
-    for root, dirs, files in os.walk(startpath):
-        # Skip hidden directories
-        dirs[:] = [d for d in dirs if not is_hidden(d)]
-        files = [f for f in files if not is_hidden(f)]   # Skip hidden files
-
-        level = root.count(os.sep) - start_level
-        if max_depth != -1 and level > max_depth:
+    return list(iter_directory_structure(startpath, max_depth))
+
+
+def _take_work(queues, index):
+    """
+    Pop the newest directory from this worker's own deque, or steal the
+    oldest one from another worker's deque when its own is empty.
+    """
+    try:
+        return queues[index].pop()
+    except IndexError:
+        pass
+    for offset in range(1, len(queues)):
+        try:
+            return queues[(index + offset) % len(queues)].popleft()
+        except IndexError:
             continue
-        if is_hidden(os.path.basename(root)):
-            continue  # Skip hidden root
+    return None
 
-        indent = ' ' * 4 * level
-        structure.append({'dir': os.path.basename(
-            root), 'level': level, 'files': files, 'subdirs': dirs})
-    return structure
 
+def generate_directory_structure_parallel(startpath, max_depth, workers):
+    """
+    Same result as generate_directory_structure, with scandir calls fanned
+    out over a pool of threads sharing work through per-worker deques with
+    work stealing. Each scanned directory becomes a node with its children
+    in scan order, and the structure list is assembled from the node tree
+    afterwards so ordering and levels match the serial walk exactly.
+    """
+    if workers <= 1:
+        return generate_directory_structure(startpath, max_depth)
+    return list(_iter_node_tree(_scan_tree_parallel(startpath, max_depth, workers)))
 
-def describe_directory_in_natural_language(structure):
-    description = []
+
+def _scan_tree_parallel(startpath, max_depth, workers):
+    """Scan the tree on worker threads and return the root node."""
+    root = {'path': startpath, 'level': 0, 'listing': None, 'children': []}
+    queues = [deque() for _ in range(workers)]
+    queues[0].append(root)
+    state = {'outstanding': 1, 'error': None}
+    condition = threading.Condition()
+
+    def worker(index):
+        while True:
+            node = _take_work(queues, index)
+            if node is None:
+                with condition:
+                    if state['outstanding'] == 0:
+                        return
+                    if not any(queues):
+                        condition.wait()
+                continue
+
+            added = 0
+            try:
+                listing = scan_directory(node['path'])
+                node['listing'] = listing
+                level = node['level']
+                if listing is not None and (max_depth == -1 or level < max_depth):
+                    node['children'] = [
+                        {'path': os.path.join(node['path'], d), 'level': level + 1,
+                         'listing': None, 'children': []}
+                        for d in listing[2]]
+                    queues[index].extend(node['children'])
+                    added = len(node['children'])
+            except BaseException as e:
+                state['error'] = e
+            finally:
+                with condition:
+                    state['outstanding'] += added - 1
+                    condition.notify_all()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+               for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if state['error'] is not None:
+        raise state['error']
+    return root
+
+
+def _iter_node_tree(root):
+    """Flatten a scanned node tree into structure entries in pre-order."""
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if node['listing'] is None:
+            continue
+        subdirs, files, _ = node['listing']
+        path, level = node['path'], node['level']
+        if level > 0 or not is_hidden(os.path.basename(path)):  # Skip hidden root
+            yield {'dir': os.path.basename(path), 'level': level,
+                   'files': files, 'subdirs': subdirs}
+        pending.extend(reversed(node['children']))
+
+
+class DirectoryTable:
+    """
+    Compact, array-backed alternative to the list-of-dicts structure.
+
+    Every name (directory or file) is interned once in a string pool and
+    referenced by its integer id. Directories are rows of parallel arrays
+    holding the name id, level and parent row, plus offsets into two flat
+    arrays of file and subdirectory name ids. Iterating yields the same
+    dicts generate_directory_structure would return, built on demand, so
+    every output format can consume either representation.
+    """
+    __slots__ = ('names', '_name_ids', 'dir_names', 'levels', 'parents',
+                 'file_offsets', 'file_ids', 'subdir_offsets', 'subdir_ids')
+
+    def __init__(self):
+        self.names = []
+        self._name_ids = {}
+        self.dir_names = array('I')
+        self.levels = array('H')
+        self.parents = array('i')
+        self.file_offsets = array('Q', [0])
+        self.file_ids = array('I')
+        self.subdir_offsets = array('Q', [0])
+        self.subdir_ids = array('I')
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a table from an iterable of structure dicts."""
+        table = cls()
+        ancestors = []  # (level, row) of the current directory's ancestors
+        for item in entries:
+            level = item['level']
+            while ancestors and ancestors[-1][0] >= level:
+                ancestors.pop()
+            parent = ancestors[-1][1] if ancestors else -1
+            row = table.add(item['dir'], level, parent, item['files'], item['subdirs'])
+            ancestors.append((level, row))
+        return table
+
+    def intern(self, name):
+        """Return the pool id for name, adding it on first use."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+    def add(self, name, level, parent, files, subdirs):
+        """Append a directory row and return its index."""
+        intern = self.intern
+        self.dir_names.append(intern(name))
+        self.levels.append(level)
+        self.parents.append(parent)
+        self.file_ids.extend(intern(f) for f in files)
+        self.file_offsets.append(len(self.file_ids))
+        self.subdir_ids.extend(intern(d) for d in subdirs)
+        self.subdir_offsets.append(len(self.subdir_ids))
+        return len(self.dir_names) - 1
+
+    def files(self, row):
+        names = self.names
+        ids = self.file_ids[self.file_offsets[row]:self.file_offsets[row + 1]]
+        return [names[i] for i in ids]
+
+    def subdirs(self, row):
+        names = self.names
+        ids = self.subdir_ids[self.subdir_offsets[row]:self.subdir_offsets[row + 1]]
+        return [names[i] for i in ids]
+
+    def __len__(self):
+        return len(self.dir_names)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('directory row out of range')
+        return {'dir': self.names[self.dir_names[row]], 'level': self.levels[row],
+                'files': self.files(row), 'subdirs': self.subdirs(row)}
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+def generate_directory_table(startpath, max_depth, workers=1):
+    """
+    Walk startpath like generate_directory_structure but store the result
+    in a DirectoryTable, adding each directory as soon as it is listed.
+    """
+    if workers <= 1:
+        entries = iter_directory_structure(startpath, max_depth)
+    else:
+        entries = _iter_node_tree(_scan_tree_parallel(startpath, max_depth, workers))
+    return DirectoryTable.from_entries(entries)
+
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'tree_writer')
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+# Directories modified this close to the previous scan are rescanned, since
+# a change within the same mtime tick would otherwise go unnoticed
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def snapshot_path(cache_dir, startpath):
+    """Return the snapshot file for startpath inside cache_dir."""
+    # Only --cache needs hashlib, so plain runs do not pay for importing it
+    import hashlib
+    key = hashlib.sha256(os.path.abspath(startpath).encode('utf-8')).hexdigest()[:32]
+    return os.path.join(cache_dir, key + '.json')
+
+
+def load_snapshot(path, startpath):
+    """Load a snapshot, returning None if it is missing, corrupt or stale."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (snapshot.get('version') != SNAPSHOT_VERSION
+            or snapshot.get('root') != os.path.abspath(startpath)):
+        return None
+    return snapshot
+
+
+def evict_snapshots(cache_dir, max_bytes, keep=None):
+    """
+    Delete the least recently used snapshots until cache_dir holds at most
+    max_bytes. A snapshot's mtime records when it was last used. keep is
+    only evicted if it alone exceeds the limit.
+    """
+    snapshots = []
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                snapshots.append((entry.path != keep, stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, _, size, _ in snapshots)
+    # Other snapshots go first, oldest first; the one just written goes last
+    snapshots.sort(key=lambda snapshot: (not snapshot[0], snapshot[1]))
+    for _, _, size, path in snapshots:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def iter_directory_structure_cached(startpath, max_depth, cache_dir=DEFAULT_CACHE_DIR,
+                                    max_cache_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Like iter_directory_structure, but backed by a persistent snapshot of
+    every directory listing and its mtime. A directory is only rescanned if
+    its mtime changed since the snapshot, so an unchanged tree costs one
+    stat per directory. The snapshot is rewritten when anything changed,
+    and snapshots for different roots share cache_dir up to
+    max_cache_bytes with least recently used eviction.
+    """
+    path = snapshot_path(cache_dir, startpath)
+    snapshot = load_snapshot(path, startpath)
+    cached = snapshot['dirs'] if snapshot else {}
+    trusted_before = snapshot['scanned_ns'] - RACY_WINDOW_NS if snapshot else 0
+    scanned_ns = time.time_ns()
+    dirs = {}
+    changed = []
+    # Walked paths are always built by joining onto startpath, so slicing
+    # gives the same key as os.path.relpath without its abspath calls
+    prefix = os.path.join(startpath, '')
+
+    def scan(dir_path):
+        rel_path = '.' if dir_path == startpath else dir_path[len(prefix):]
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
+        entry = cached.get(rel_path)
+        if entry is not None and entry[0] == mtime_ns and mtime_ns < trusted_before:
+            listing = (entry[1], entry[2], entry[3])
+        else:
+            listing = scan_directory(dir_path)
+            if listing is None:
+                return None
+            changed.append(rel_path)
+        dirs[rel_path] = [mtime_ns, *listing]
+        return listing
+
+    yield from iter_directory_structure(startpath, max_depth, scan)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if snapshot is not None and not changed and dirs.keys() == cached.keys():
+        # Nothing to rewrite; just mark the snapshot as recently used
+        os.utime(path)
+        return
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': SNAPSHOT_VERSION, 'root': os.path.abspath(startpath),
+                   'scanned_ns': scanned_ns, 'dirs': dirs}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    evict_snapshots(cache_dir, max_cache_bytes, keep=path)
+
+
+# inotify event bits, from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Only changes to a directory's list of names matter for the tree
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+# struct layout of the fixed part of each event read from the inotify fd
+INOTIFY_EVENT = 'iIII'
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("watch mode needs Linux inotify")
+        # Imported here so only --watch pays for them
+        import ctypes
+        import select
+        import struct
+        self._ctypes = ctypes
+        self._select = select.select
+        self._event = struct.Struct(INOTIFY_EVENT)
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._check(self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+
+    def _check(self, result):
+        if result < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        return self._check(self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask))
+
+    def rm_watch(self, wd):
+        # The kernel drops watches on deleted directories by itself
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """Return the (wd, mask, name) events available within timeout seconds."""
+        if not self._select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._event.unpack_from(data, offset)
+            offset += self._event.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Keeps the directory listings of a tree current from inotify events.
+
+    Every listed directory within max_depth has a watch. Events only mark
+    their directory dirty; apply() then rescans just the dirty directories,
+    adding or dropping the subtrees of directories that appeared or went
+    away, so the work done is proportional to what changed. Directories the
+    kernel refuses to watch (e.g. past max_user_watches) are still listed,
+    with a warning that they will not be kept current.
+    """
+
+    def __init__(self, startpath, max_depth):
+        self.startpath = startpath
+        self.max_depth = max_depth
+        self.inotify = Inotify()
+        self.listings = {}
+        self.levels = {}
+        self.paths_by_wd = {}
+        self.wds_by_path = {}
+        self._add_tree(startpath, 0)
+
+    def structure(self):
+        """Yield the current structure entries without touching the disk."""
+        return iter_directory_structure(self.startpath, self.max_depth, self.listings.get)
+
+    def _add_tree(self, path, level):
+        pending = [(path, level)]
+        unwatched = []
+        while pending:
+            path, level = pending.pop()
+            # Watch before listing so nothing created in between is missed
+            error = None
+            try:
+                wd = self.inotify.add_watch(path)
+            except OSError as e:
+                error = e
+            else:
+                # A directory moved between watched parents keeps its wd, so
+                # this path takes it over from the old one
+                self.paths_by_wd[wd] = path
+                self.wds_by_path[path] = wd
+            listing = scan_directory(path)
+            if listing is None:
+                self._forget(path)
+                continue
+            if error is not None:
+                unwatched.append((path, error))
+            self.listings[path] = listing
+            self.levels[path] = level
+            if self.max_depth == -1 or level < self.max_depth:
+                pending.extend((os.path.join(path, d), level + 1) for d in listing[2])
+        if unwatched:
+            path, e = unwatched[0]
+            warnings.warn(f"{len(unwatched)} directories are listed but not watched, "
+                          f"starting with {path}: {e.strerror}", RuntimeWarning)
+
+    def _forget(self, path):
+        self.listings.pop(path, None)
+        self.levels.pop(path, None)
+        wd = self.wds_by_path.pop(path, None)
+        # Leave the watch alone if a moved directory's new path now owns it
+        if wd is not None and self.paths_by_wd.get(wd) == path:
+            del self.paths_by_wd[wd]
+            self.inotify.rm_watch(wd)
+
+    def _remove_tree(self, path):
+        prefix = os.path.join(path, '')
+        for known in [p for p in self.listings if p == path or p.startswith(prefix)]:
+            self._forget(known)
+
+    def _refresh(self, path):
+        """Rescan one directory; return True if its listing changed."""
+        old = self.listings.get(path)
+        if old is None:
+            return False
+        listing = scan_directory(path)
+        if listing is None:
+            self._remove_tree(path)
+            return True
+        if listing == old:
+            return False
+        self.listings[path] = listing
+        level = self.levels[path]
+        if self.max_depth == -1 or level < self.max_depth:
+            old_walkable, new_walkable = set(old[2]), set(listing[2])
+            for name in old_walkable - new_walkable:
+                self._remove_tree(os.path.join(path, name))
+            for name in listing[2]:
+                if name not in old_walkable:
+                    self._add_tree(os.path.join(path, name), level + 1)
+        return True
+
+    def poll(self, timeout, debounce=0.0):
+        """
+        Wait up to timeout seconds for events, then keep collecting until
+        none arrive for debounce seconds. Returns the dirty directories, or
+        None if the event queue overflowed and everything must be rescanned.
+        """
+        dirty = set()
+        events = self.inotify.read(timeout)
+        while events:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED or (name and is_hidden(name)):
+                    continue
+                path = self.paths_by_wd.get(wd)
+                if path is not None:
+                    dirty.add(path)
+            events = self.inotify.read(debounce)
+        return dirty
+
+    def apply(self, dirty):
+        """Rescan dirty directories (all of them for None); return True if anything changed."""
+        if dirty is None:
+            dirty = list(self.listings)
+        changed = False
+        # Parents first, so a removed subtree is not rescanned pointlessly
+        for path in sorted(dirty, key=lambda p: self.levels.get(p, 0)):
+            changed = self._refresh(path) or changed
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+def watch(startpath, max_depth, output, format, debounce=0.5, processes=False):
+    """
+    Write the selected format(s), then keep them current: rewrite the
+    outputs, at most once per debounce interval, whenever the tree changes.
+    Runs until interrupted.
+    """
+    def write():
+        if format == '*':
+            save_all_formats(DirectoryTable.from_entries(watcher.structure()), output, processes)
+        else:
+            save_to_file(watcher.structure(), output, format)
+
+    watcher = DirectoryWatcher(startpath, max_depth)
+    try:
+        write()
+        while True:
+            dirty = watcher.poll(None, debounce)
+            # Outputs written inside the tree fire events too, but rewriting
+            # them leaves the listings unchanged, so this settles
+            if watcher.apply(dirty):
+                write()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def iter_natural_language(structure):
+    """Yield the lines of describe_directory_in_natural_language one at a time."""
     for item in structure:
         dir_name = item['dir']
         num_files = len(item['files'])
         num_subdirs = len(item['subdirs'])
         indent = ' ' * 4 * item['level']
 
-        description.append(
-            f"{indent}The directory '{dir_name}' contains {num_files} files and {num_subdirs} subdirectories.")
+        yield f"{indent}The directory '{dir_name}' contains {num_files} files and {num_subdirs} subdirectories."
         if num_files > 0:
             file_list = ', '.join([f"'{file}'" for file in item['files']])
-            description.append(
-                f"{indent} The list of files includes: {file_list}.")
+            yield f"{indent} The list of files includes: {file_list}."
         if num_subdirs > 0:
             subdir_list = ', '.join(
                 [f"'{subdir}'" for subdir in item['subdirs']])
-            description.append(
-                f"{indent} The subdirectories are: {subdir_list}.")
+            yield f"{indent} The subdirectories are: {subdir_list}."
+
+
+def describe_directory_in_natural_language(structure):
+    return '\n'.join(iter_natural_language(structure))
 
-    return '\n'.join(description)
+
+def _iter_joined(lines, separator='\n'):
+    """Yield lines with separator between them, like separator.join(lines)."""
+    for i, line in enumerate(lines):
+        yield separator + line if i else line
+
+
+def write_txt(structure, f):
+    write_txt_lines((str(item) for item in structure), f)
+
+
+def write_txt_lines(lines, f):
+    f.writelines(_iter_joined(lines))
+
+
+def write_natural(structure, f):
+    f.writelines(_iter_joined(iter_natural_language(structure)))
+
+
+def write_html(structure, f):
+    write_html_lines((str(item) for item in structure), f)
+
+
+def write_html_lines(lines, f):
+    jinja2 = load_backend('html')
+    template = jinja2.Template(
+        '<html><body><pre>{% for line in lines %}{{ line }}{% endfor %}</pre></body></html>')
+    # stream() renders chunk by chunk instead of building one big string
+    template.stream(lines=_iter_joined(lines)).dump(f)
+
+
+def write_json(structure, f):
+    """Write the same text as json.dump(list(structure), f, indent=4), one item at a time."""
+    empty = True
+    for item in structure:
+        f.write('[\n    ' if empty else ',\n    ')
+        # JSON escapes newlines inside strings, so every newline is layout
+        f.write(json.dumps(item, indent=4).replace('\n', '\n    '))
+        empty = False
+    f.write('[]' if empty else '\n]')
+
+
+def write_yaml(structure, f):
+    """Write the same text as yaml.dump(list(structure), f), one item at a time."""
+    yaml = load_backend('yaml')
+    empty = True
+    for item in structure:
+        # A one-item block sequence renders exactly like that item would
+        # inside the full list
+        yaml.dump([item], f)
+        empty = False
+    if empty:
+        yaml.dump([], f)
+
+
+@contextmanager
+def open_output(path):
+    """
+    Open path for writing through a hidden temporary file that replaces
+    path once writing succeeds. Hidden files are skipped by the scanners,
+    so an output written while its own directory is being walked never
+    shows up in the tree.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# File name suffix appended to the output name for each format
+OUTPUT_SUFFIXES = {
+    'txt': '_t.txt',
+    'natural': '_n.txt',
+    'html': '.html',
+    'json': '.json',
+    'yaml': '.yaml',
+    'pdf': '.pdf',
+}
 
 
 def save_to_file(structure, filename, format):
+    """
+    Write structure in the given format. structure may be any iterable of
+    directory dicts, including a generator that is still walking the tree;
+    every text format is written one directory at a time.
+    """
+    writers = {
+        'txt': write_txt,
+        'natural': write_natural,
+        'html': write_html,
+        'json': write_json,
+        'yaml': write_yaml,
+    }
     if format == 'pdf':
         save_to_pdf(structure, filename)
-    elif format in ['txt', 'natural']:
-        if format == 'txt':
-            content = '\n'.join([str(item) for item in structure])
-        else:
-            content = describe_directory_in_natural_language(structure)
-        with open(filename + '_' + format[0] + '.txt', 'w') as f:
-            f.write(content)
-    elif format == 'html':
-        template = Template(
-            '<html><body><pre>{{ content }}</pre></body></html>')
-        rendered = template.render(content='\n'.join(
-            [str(item) for item in structure]))
-        with open(filename + '.html', 'w') as f:
-            f.write(rendered)
-    elif format == 'json':
-        with open(filename + '.json', 'w') as f:
-            json.dump(structure, f, indent=4)
-    elif format == 'yaml':
-        with open(filename + '.yaml', 'w') as f:
-            yaml.dump(structure, f)
-
-
-def save_to_pdf(structure, filename):
-    c = canvas.Canvas(filename + '.pdf')
-    textobject = c.beginText(40, 800)
-    textobject.setFont("Times-Roman", 12)
+    elif format in writers:
+        with open_output(filename + OUTPUT_SUFFIXES[format]) as f:
+            writers[format](structure, f)
+
 
+def iter_pdf_lines(structure):
+    """Yield the lines of the PDF listing: each directory followed by its files."""
     for item in structure:
-        line = ' ' * 4 * item['level'] + f"{item['dir']}/"
-        textobject.textLine(line)
+        yield ' ' * 4 * item['level'] + f"{item['dir']}/"
         for file in item['files']:
-            file_line = ' ' * 4 * (item['level'] + 1) + file
-            textobject.textLine(file_line)
+            yield ' ' * 4 * (item['level'] + 1) + file
+
+
+def save_to_pdf(structure, filename, font_size=12, top=800, bottom=40, left=40):
+    """
+    Render the listing as a paginated PDF. Each page gets one text object
+    that is drawn and closed with showPage as soon as it is full, so only
+    the current page's lines are held as separate Python objects; finished
+    pages are kept by reportlab as a single string each until save().
+    """
+    canvas = load_backend('pdf')
+    c = canvas.Canvas(filename + '.pdf')
+    leading = font_size * 1.2
+    lines_per_page = max(1, int((top - bottom) // leading) + 1)
 
-    c.drawText(textobject)
+    def begin_page():
+        textobject = c.beginText(left, top)
+        textobject.setFont("Times-Roman", font_size, leading)
+        return textobject
+
+    textobject = begin_page()
+    page_lines = 0
+    for line in iter_pdf_lines(structure):
+        if textobject is None:
+            textobject = begin_page()
+        textobject.textLine(line)
+        page_lines += 1
+        if page_lines == lines_per_page:
+            c.drawText(textobject)
+            c.showPage()
+            textobject = None
+            page_lines = 0
+
+    if textobject is not None:
+        c.drawText(textobject)
     c.save()
 
 
-def save_all_formats(structure, filename):
+# Formats fed the pre-rendered str(item) lines rather than the items
+LINE_FORMATS = ('txt', 'html')
+# CPU-heavy formats that may be rendered in their own process
+PROCESS_FORMATS = ('pdf', 'yaml')
+# Items sent to the sinks per queue message, and messages buffered per sink
+FANOUT_BATCH_SIZE = 256
+FANOUT_QUEUE_SIZE = 16
+
+
+def _iter_batches(source):
+    """Yield the items of batches taken from source until a None batch."""
+    while True:
+        batch = source.get()
+        if batch is None:
+            return
+        yield from batch
+
+
+def _run_sink(source, filename, fmt):
+    """Write one format from batches arriving on source."""
+    items = _iter_batches(source)
+    try:
+        if fmt in LINE_FORMATS:
+            writer = write_txt_lines if fmt == 'txt' else write_html_lines
+            with open_output(filename + OUTPUT_SUFFIXES[fmt]) as f:
+                writer(items, f)
+        else:
+            save_to_file(items, filename, fmt)
+    finally:
+        # Keep draining after a failure so the producer never blocks
+        for _ in items:
+            pass
+
+
+def _run_sink_in_thread(source, filename, fmt, errors):
+    try:
+        _run_sink(source, filename, fmt)
+    except BaseException as e:
+        errors.append(e)
+
+
+def save_all_formats(structure, filename, processes=False):
+    """
+    Write every format while walking structure only once. Each format is a
+    sink fed batches of items through a bounded queue, and str(item) is
+    computed once for both txt and html. Sinks run on threads; with
+    processes=True the PDF and YAML sinks run in their own processes so
+    the CPU-heavy formats render in parallel.
+    """
+    if processes:
+        import multiprocessing
+
     output_dir = "trees"
     os.makedirs(output_dir, exist_ok=True)
     formats = ['txt', 'html', 'pdf', 'json', 'yaml', 'natural']
+    base = os.path.join(output_dir, filename)
 
+    errors = []
+    sinks = []
     for fmt in formats:
-        save_to_file(structure, os.path.join(output_dir, filename), fmt)
+        if processes and fmt in PROCESS_FORMATS:
+            source = multiprocessing.Queue(FANOUT_QUEUE_SIZE)
+            worker = multiprocessing.Process(target=_run_sink, args=(source, base, fmt))
+        else:
+            source = queue.Queue(FANOUT_QUEUE_SIZE)
+            worker = threading.Thread(target=_run_sink_in_thread,
+                                      args=(source, base, fmt, errors))
+        sinks.append((fmt, source, worker))
+    # Fork the process sinks while this is still the only thread, since a
+    # child forked mid-write could inherit a lock some thread is holding
+    for _, _, worker in sorted(sinks, key=lambda sink: isinstance(sink[2], threading.Thread)):
+        worker.start()
+
+    try:
+        items = iter(structure)
+        while True:
+            batch = list(islice(items, FANOUT_BATCH_SIZE))
+            if not batch:
+                break
+            lines = [str(item) for item in batch]
+            for fmt, source, _ in sinks:
+                source.put(lines if fmt in LINE_FORMATS else batch)
+    finally:
+        for _, source, _ in sinks:
+            source.put(None)
+        for _, _, worker in sinks:
+            worker.join()
+
+    if errors:
+        raise errors[0]
+    for fmt, _, worker in sinks:
+        if processes and fmt in PROCESS_FORMATS and worker.exitcode != 0:
+            raise RuntimeError(f"{fmt} writer exited with code {worker.exitcode}")
 
 
 def is_hidden(path):
@@ -114,13 +887,38 @@ def main():
                         'json', 'yaml', 'natural', '*'], default='txt', help="Output format")
     parser.add_argument("-d", "--depth", type=int, default=-1,
                         help="Maximum depth for mapping, -1 for unlimited, defaults to -1")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of threads scanning directories in parallel, defaults to 1")
+    parser.add_argument("--processes", action="store_true",
+                        help="With -f '*', render the PDF and YAML outputs in separate processes")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse a snapshot of the previous walk, rescanning only directories whose mtime changed")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Directory holding snapshots, defaults to {DEFAULT_CACHE_DIR}")
+
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep the outputs up to date as the tree changes (Linux only)")
+    parser.add_argument("--debounce", type=float, default=0.5,
+                        help="Seconds of quiet to wait for before rewriting outputs in watch mode")
 
     args = parser.parse_args()
 
-    structure = generate_directory_structure(args.path, args.depth)
+    if args.watch:
+        watch(args.path, args.depth, args.output, args.format, args.debounce, args.processes)
+        return
+
+    if args.cache:
+        structure = iter_directory_structure_cached(args.path, args.depth, args.cache_dir)
+    elif args.workers <= 1:
+        # A single format is written while the tree is still being walked
+        structure = iter_directory_structure(args.path, args.depth)
+    else:
+        structure = generate_directory_table(args.path, args.depth, args.workers)
 
     if args.format == '*':
-        save_all_formats(structure, args.output)
+        if not isinstance(structure, DirectoryTable):
+            structure = DirectoryTable.from_entries(structure)
+        save_all_formats(structure, args.output, args.processes)
     else:
         save_to_file(structure, args.output, args.format)
 
@@ -3,7 +3,23 @@ import os
 import tempfile
 import shutil
 import json
-from src.combine_markdown import collect_markdown_files, combine_markdown_files, read_reading_order, is_valid_file
+import io
+from contextlib import redirect_stdout
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from src.combine_markdown import (
+    collect_markdown_files,
+    combine_markdown_files,
+    read_reading_order,
+    is_valid_file,
+    build_reading_order_index,
+    count_existing_entries,
+    combine_markdown_files_incremental,
+    manifest_path_for,
+    main,
+    _prefetch_bodies,
+    COPY_BUFFER_SIZE
+)
 
 class TestCombineMarkdown(unittest.TestCase):
     def setUp(self):
@@ -117,6 +133,129 @@ class TestCombineMarkdown(unittest.TestCase):
         self.assertIn('START OF FILE:', content)
         self.assertIn('END OF FILE:', content)
 
+    def test_combine_streams_in_small_chunks(self):
+        # Use a buffer much smaller than the input so the copy loops
+        big_content = ''.join(f"line {i} \u00e9\n" for i in range(2000))
+        big_file = os.path.join(self.test_dir, 'big.md')
+        with open(big_file, 'w', encoding='utf-8') as f:
+            f.write(big_content)
+        output_file = os.path.join(self.test_dir, 'combined.md')
+
+        combine_markdown_files([big_file], output_file, buffer_size=7)
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        expected = (f"\n<!-- START OF FILE: {big_file} -->\n\n"
+                    f"{big_content}"
+                    f"\n\n<!-- END OF FILE: {big_file} -->\n")
+        self.assertEqual(content, expected)
+
+    def test_combine_normalizes_newlines_like_text_mode(self):
+        crlf_file = os.path.join(self.test_dir, 'crlf.md')
+        with open(crlf_file, 'wb') as f:
+            f.write('a\r\nb\rc\u00e9\r\n'.encode('utf-8'))
+        output_file = os.path.join(self.test_dir, 'combined.md')
+
+        # A 1-byte buffer splits every CRLF and multi-byte character
+        outputs = []
+        for buffer_size, workers in ((1, 1), (COPY_BUFFER_SIZE, 1), (COPY_BUFFER_SIZE, 2)):
+            with redirect_stdout(io.StringIO()):
+                combine_markdown_files([crlf_file], output_file, buffer_size=buffer_size,
+                                       workers=workers)
+            with open(output_file, 'rb') as f:
+                outputs.append(f.read())
+        self.assertIn('\n\na\nb\nc\u00e9\n\n\n'.encode('utf-8'), outputs[0])
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+    def test_combine_rejects_invalid_utf8(self):
+        bad_file = os.path.join(self.test_dir, 'bad.md')
+        with open(bad_file, 'wb') as f:
+            f.write(b'ok \xff\xfe')
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        for workers in (1, 2):
+            with self.assertRaises(UnicodeDecodeError):
+                combine_markdown_files([bad_file], output_file, workers=workers)
+
+    def test_combine_reencodes_non_utf8_input(self):
+        latin_file = os.path.join(self.test_dir, 'latin.txt')
+        with open(latin_file, 'w', encoding='latin-1') as f:
+            f.write('caf\u00e9 cr\u00e8me')
+        output_file = os.path.join(self.test_dir, 'combined.md')
+
+        combine_markdown_files([latin_file], output_file, buffer_size=3, encoding='latin-1')
+
+        with open(output_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('caf\u00e9 cr\u00e8me', content)
+
+    def test_combine_reports_peak_memory(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            combine_markdown_files(files, output_file)
+
+        summary = out.getvalue()
+        self.assertIn(f"Combined {len(files)} files into {output_file}", summary)
+        if os.name == 'posix':
+            self.assertIn('peak memory:', summary)
+
+    def test_combine_parallel_matches_serial(self):
+        for i in range(40):
+            with open(os.path.join(self.test_dir, f'extra{i:02d}.md'), 'w') as f:
+                f.write(f'# Extra {i}\n' * (i + 1))
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+
+        outputs = []
+        # A tiny budget forces the larger files down the streaming path
+        for workers, prefetch_bytes in ((1, 1024), (4, 1024 * 1024), (4, 800)):
+            with redirect_stdout(io.StringIO()):
+                combine_markdown_files(files, output_file, workers=workers,
+                                       prefetch_bytes=prefetch_bytes)
+            with open(output_file, 'rb') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+    def test_prefetch_holds_at_most_window_bodies(self):
+        files = [os.path.join(self.test_dir, f'extra{i:02d}.md') for i in range(20)]
+        for file in files:
+            with open(file, 'w') as f:
+                f.write('# Extra\n')
+        submit = ThreadPoolExecutor.submit
+        submitted = []
+        def counting_submit(executor, *args, **kwargs):
+            submitted.append(args[1])
+            return submit(executor, *args, **kwargs)
+
+        workers = 2
+        held = []
+        with mock.patch.object(ThreadPoolExecutor, 'submit', autospec=True,
+                               side_effect=counting_submit):
+            for consumed, (file, data) in enumerate(_prefetch_bodies(files, 'utf-8', workers, 1024)):
+                # Bodies read but not yet fully written, including this one
+                held.append(len(submitted) - consumed)
+        self.assertEqual(submitted, files)
+        self.assertEqual(max(held), 2 * workers)
+
+    def test_combine_parallel_reencodes_like_serial(self):
+        latin_file = os.path.join(self.test_dir, 'latin.txt')
+        with open(latin_file, 'wb') as f:
+            f.write('caf\u00e9\r\nligne\rdeux'.encode('latin-1'))
+        output_file = os.path.join(self.test_dir, 'combined.md')
+
+        outputs = []
+        for workers in (1, 2):
+            with redirect_stdout(io.StringIO()):
+                combine_markdown_files([latin_file], output_file, encoding='latin-1', workers=workers)
+            with open(output_file, 'rb') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn('caf\u00e9\nligne\ndeux'.encode('utf-8'), outputs[1])
+
     def test_reading_order_json_present(self):
         # Create a reading_order.json file
         reading_order_content = {
@@ -219,5 +358,152 @@ class TestCombineMarkdown(unittest.TestCase):
             )
             self.assertNotIn('master.md', file)
 
+    def test_build_reading_order_index(self):
+        reading_order = [
+            {"document": "test2.md"},
+            {"document": "subdir/test5.md"},
+            {"document": "missing.md"},
+            {"document": "test2.md"}
+        ]
+        index = build_reading_order_index(reading_order, self.test_dir)
+
+        # First occurrence wins for duplicated documents
+        self.assertEqual(index['positions'], {
+            'test2.md': 0,
+            'subdir/test5.md': 1,
+            'missing.md': 2
+        })
+        self.assertEqual(count_existing_entries(index), 3)
+
+        # The existence count is computed once and then cached
+        with mock.patch('src.combine_markdown.os.path.exists') as exists:
+            self.assertEqual(count_existing_entries(index), 3)
+            exists.assert_not_called()
+
+    def test_collect_stats_reading_order_once(self):
+        reading_order = [{"document": f"missing{i}.md"} for i in range(50)]
+        reading_order.append({"document": "subdir/test5.md"})
+        os.makedirs(os.path.join(self.test_dir, 'other'))
+        with open(os.path.join(self.test_dir, 'other', 'test6.txt'), 'w') as f:
+            f.write('Other text content')
+
+        output_file = os.path.join(self.test_dir, 'new_master.md')
+        real_exists = os.path.exists
+        with mock.patch('src.combine_markdown.os.path.exists', side_effect=real_exists) as exists, \
+                redirect_stdout(io.StringIO()):
+            files = collect_markdown_files(self.test_dir, reading_order, output_file)
+
+        # Two test6.txt files are checked but each entry is stat'ed only once
+        self.assertEqual(exists.call_count, len(reading_order))
+        self.assertTrue(files[0].endswith('test5.md'))
+        self.assertEqual(len(files), 6)
+
+    def _combine_incremental(self, files, output_file):
+        with redirect_stdout(io.StringIO()):
+            return combine_markdown_files_incremental(files, output_file)
+
+    def _combine_full(self, files):
+        output_file = os.path.join(self.test_dir, 'full.md')
+        with redirect_stdout(io.StringIO()):
+            combine_markdown_files(files, output_file)
+        with open(output_file, 'rb') as f:
+            return f.read()
+
+    def test_incremental_first_run_writes_manifest(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+
+        stats = self._combine_incremental(files, output_file)
+        self.assertEqual(stats, {'reused': 0, 'rebuilt': len(files)})
+
+        with open(output_file, 'rb') as f:
+            output = f.read()
+        self.assertEqual(output, self._combine_full(files))
+
+        with open(manifest_path_for(output_file), 'r') as f:
+            manifest = json.load(f)
+        self.assertEqual([s['path'] for s in manifest['segments']], files)
+        for segment in manifest['segments']:
+            block = output[segment['start']:segment['end']].decode('utf-8')
+            self.assertTrue(block.startswith(f"\n<!-- START OF FILE: {segment['path']} -->"))
+            self.assertTrue(block.endswith(f"<!-- END OF FILE: {segment['path']} -->\n"))
+
+    def test_incremental_rebuilds_only_changed_files(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+        self._combine_incremental(files, output_file)
+
+        # Nothing changed: the output is left untouched
+        self.assertEqual(self._combine_incremental(files, output_file),
+                         {'reused': len(files), 'rebuilt': 0})
+
+        changed = os.path.join(self.test_dir, 'test2.md')
+        with open(changed, 'w') as f:
+            f.write('# Test 2\nRewritten and longer content')
+
+        real_open = open
+        opened = []
+        def tracking_open(path, *args, **kwargs):
+            opened.append(path)
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch('builtins.open', side_effect=tracking_open):
+            stats = self._combine_incremental(files, output_file)
+        self.assertEqual(stats, {'reused': len(files) - 1, 'rebuilt': 1})
+        source_reads = [p for p in opened if p in files]
+        self.assertEqual(source_reads, [changed])
+
+        with open(output_file, 'rb') as f:
+            output = f.read()
+        self.assertEqual(output, self._combine_full(files))
+
+    def test_incremental_handles_added_and_touched_files(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+        self._combine_incremental(files, output_file)
+
+        # Touching a file without changing it keeps its cached segment
+        touched = os.path.join(self.test_dir, 'test1.md')
+        stat = os.stat(touched)
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with open(os.path.join(self.test_dir, 'test0.md'), 'w') as f:
+            f.write('# Test 0')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+
+        stats = self._combine_incremental(files, output_file)
+        self.assertEqual(stats, {'reused': len(files) - 1, 'rebuilt': 1})
+        with open(output_file, 'rb') as f:
+            self.assertEqual(f.read(), self._combine_full(files))
+
+    def test_incremental_ignores_stale_manifest(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        files = collect_markdown_files(self.test_dir, output_file=output_file)
+        self._combine_incremental(files, output_file)
+
+        # Editing the output by hand invalidates the recorded offsets
+        with open(output_file, 'a') as f:
+            f.write('manual edit')
+
+        stats = self._combine_incremental(files, output_file)
+        self.assertEqual(stats, {'reused': 0, 'rebuilt': len(files)})
+        with open(output_file, 'rb') as f:
+            self.assertEqual(f.read(), self._combine_full(files))
+
+    def test_main_treats_end_of_input_as_no(self):
+        output_file = os.path.join(self.test_dir, 'combined.md')
+        # Piped input that only answers the first two prompts
+        answers = [self.test_dir, output_file, EOFError()]
+        with mock.patch('builtins.input', side_effect=answers), \
+                mock.patch('src.combine_markdown.combine_markdown_files') as combine:
+            with redirect_stdout(io.StringIO()):
+                main(['--workers', '4', '--prefetch-bytes', '1024'])
+        self.assertEqual(combine.call_args.kwargs, {'workers': 4, 'prefetch_bytes': 1024})
+
+        with mock.patch('builtins.input', side_effect=[self.test_dir, output_file]), \
+                mock.patch('src.combine_markdown.combine_markdown_files_incremental') as combine:
+            with redirect_stdout(io.StringIO()):
+                main(['--incremental'])
+        combine.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,9 +5,43 @@ Unit tests for the TestDataGenerator class.
 
 import unittest
 import os
+import re
+import asyncio
 import csv
+import io
+import socket
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sqlite3
+import random
+import shutil
+import tempfile
 from datetime import datetime
-from src.test_data_generator import TestDataGenerator, ColumnConfig
+from src.test_data_generator import (TestDataGenerator, ColumnConfig, CharPool, UniquePermutation,
+                                     UniqueFilter, iso_dates, shard_sizes, AliasTable, ZipfSampler,
+                                     SocketSink, HttpSink)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ALL_TYPES = [
+    ColumnConfig(name="id", data_type="integer", min_value=1, max_value=10),
+    ColumnConfig(name="name", data_type="string"),
+    ColumnConfig(name="label", data_type="string", pattern="fixed"),
+    ColumnConfig(name="email", data_type="email"),
+    ColumnConfig(name="score", data_type="float", min_value=0.0, max_value=100.0),
+    ColumnConfig(name="joined", data_type="date"),
+    ColumnConfig(name="phone", data_type="phone", null_probability=0.3)
+]
 
 class TestTestDataGenerator(unittest.TestCase):
     """Test cases for TestDataGenerator functionality."""
@@ -65,6 +99,22 @@ class TestTestDataGenerator(unittest.TestCase):
         self.assertIn("@", value)
         self.assertIn(".", value)
 
+    def test_single_values_draw_small_pools(self):
+        """Test one-off values do not draw a full CharPool of random bytes."""
+        bits = []
+
+        class CountingRandom(random.Random):
+            def getrandbits(self, k):
+                bits.append(k)
+                return super().getrandbits(k)
+
+        self.generator.random = CountingRandom(1)
+        for data_type in ("string", "email", "phone"):
+            config = ColumnConfig(name="test", data_type=data_type)
+            self.generator._generate_value(config)
+            getattr(self.generator, f"_generate_{data_type}")(config)
+        self.assertLess(max(bits), 8 * 1024)
+
     def test_generate_float(self):
         """Test float generation."""
         config = ColumnConfig(name="test", data_type="float", min_value=0.0, max_value=1.0)
@@ -107,5 +157,743 @@ class TestTestDataGenerator(unittest.TestCase):
         
         self.assertTrue(all(v is None for v in generator.data["nullable"]))
 
+    def assert_valid_values(self, data, num_rows):
+        """Check every column of ALL_TYPES data against its type's rules."""
+        for column in ALL_TYPES:
+            self.assertEqual(len(data[column.name]), num_rows)
+        self.assertTrue(all(1 <= v <= 10 for v in data["id"]))
+        self.assertTrue(all(re.fullmatch(r'[A-Za-z]{5,20}', v) for v in data["name"]))
+        self.assertEqual(set(data["label"]), {"fixed"})
+        self.assertTrue(all(re.fullmatch(r'[a-z]{5,10}@(example\.com|test\.org|sample\.net)', v)
+                            for v in data["email"]))
+        self.assertTrue(all(0.0 <= v <= 100.0 and round(v, 2) == v for v in data["score"]))
+        for v in data["joined"]:
+            self.assertTrue("2000-01-01" <= v <= "2023-12-31")
+            datetime.strptime(v, "%Y-%m-%d")
+        phones = [v for v in data["phone"] if v is not None]
+        self.assertTrue(0 < len(phones) < num_rows)
+        self.assertTrue(all(re.fullmatch(r'[1-9]\d{2}-[1-9]\d{2}-[1-9]\d{3}', v) for v in phones))
+
+    def test_seed_is_reproducible(self):
+        """Test seeded generators repeat their output."""
+        runs = []
+        for _ in range(2):
+            generator = TestDataGenerator(ALL_TYPES, seed=42)
+            generator.generate_data(50)
+            runs.append(generator.data)
+        self.assertEqual(runs[0], runs[1])
+        self.assert_valid_values(runs[0], 50)
+
+    def test_unsupported_backend(self):
+        """Test unknown backends are rejected."""
+        with self.assertRaises(ValueError):
+            TestDataGenerator(self.columns, backend="fortran")
+
+    def test_unsupported_data_type(self):
+        """Test unknown data types are rejected when the generator is built."""
+        columns = self.columns + [ColumnConfig(name="blob", data_type="blob")]
+        for backend in ("python", "numpy") if numpy is not None else ("python",):
+            with self.assertRaises(ValueError):
+                TestDataGenerator(columns, backend=backend)
+
+    def test_plan_null_probability(self):
+        """Test compiled columns honour null_probability at both extremes."""
+        generator = TestDataGenerator([
+            ColumnConfig(name="always", data_type="integer", null_probability=1.0),
+            ColumnConfig(name="never", data_type="date"),
+        ], seed=3)
+        generator.generate_data(100)
+        self.assertEqual(generator.data["always"], [None] * 100)
+        self.assertNotIn(None, generator.data["never"])
+
+    def related_generator(self, parent_ids, unique=False, backend="python", seed=5):
+        columns = [
+            ColumnConfig(name="order_id", data_type="integer"),
+            ColumnConfig(name="customer_id", data_type="integer",
+                         related_to="customers.id", unique=unique),
+        ]
+        return TestDataGenerator(columns, seed=seed, backend=backend,
+                                 references={"customers.id": parent_ids})
+
+    def test_related_to(self):
+        """Test related columns only draw keys from the referenced column."""
+        parent = TestDataGenerator([ColumnConfig(name="id", data_type="integer",
+                                                 min_value=10**6, max_value=10**7)], seed=1)
+        parent.generate_data(20)
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = self.related_generator(parent.data["id"], backend=backend)
+            generator.generate_data(200)
+            self.assertTrue(set(generator.data["customer_id"]) <= set(parent.data["id"]))
+
+    def test_related_to_unique(self):
+        """Test unique related columns use every key exactly once, then fail."""
+        keys = list(range(100, 150))
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = self.related_generator(keys, unique=True, backend=backend)
+            customer_ids = [row[1] for batch in generator.iter_batches(50, batch_size=7)
+                            for row in batch]
+            self.assertEqual(sorted(customer_ids), keys)
+            with self.assertRaises(ValueError):
+                generator.generate_data(1)
+
+    def test_related_to_missing_reference(self):
+        """Test an unknown related_to fails when the generator is built."""
+        with self.assertRaises(ValueError):
+            self.related_generator([])
+        with self.assertRaises(ValueError):
+            TestDataGenerator([ColumnConfig(name="customer_id", data_type="integer",
+                                            related_to="customers.id")])
+
+    def test_related_to_earlier_column(self):
+        """Test a related_to naming an earlier column samples the values it produced so far."""
+        columns = [
+            ColumnConfig(name="employee_id", data_type="integer", min_value=1, max_value=10**6),
+            ColumnConfig(name="manager_id", data_type="integer", related_to="employee_id"),
+        ]
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = TestDataGenerator(columns, seed=6, backend=backend)
+            generator.generate_data(300)
+            employees, managers = generator.data["employee_id"], generator.data["manager_id"]
+            self.assertTrue(set(managers) <= set(employees))
+            if backend == "python":
+                # Each row only refers to rows generated up to and including itself
+                self.assertTrue(all(m in employees[:i + 1] for i, m in enumerate(managers)))
+
+        invalid = [
+            [ColumnConfig(name="manager_id", data_type="integer", related_to="employee_id"),
+             ColumnConfig(name="employee_id", data_type="integer")],
+            [ColumnConfig(name="employee_id", data_type="integer"),
+             ColumnConfig(name="manager_id", data_type="integer", related_to="employee_id",
+                          unique=True)],
+        ]
+        for columns in invalid:
+            with self.assertRaises(ValueError):
+                TestDataGenerator(columns)
+        with self.assertRaises(ValueError):
+            TestDataGenerator(invalid[1][:1] + [invalid[0][0]], counter_based=True)
+
+    def test_related_to_unique_sharded(self):
+        """Test unique keys are not repeated across shards."""
+        directory = self.make_output_dir()
+        path = os.path.join(directory, 'orders.csv')
+        generator = self.related_generator(list(range(1000)), unique=True)
+        generator.write_csv_sharded(path, 1000, shards=3, processes=2)
+        with open(path, newline='') as csvfile:
+            customer_ids = [int(row["customer_id"]) for row in csv.DictReader(csvfile)]
+        self.assertEqual(sorted(customer_ids), list(range(1000)))
+
+    def test_related_to_unique_mixed_sequential_and_sharded(self):
+        """Test sharded runs never reuse keys drawn before or after them."""
+        path = os.path.join(self.make_output_dir(), 'orders.csv')
+        generator = self.related_generator(list(range(20)), unique=True)
+        generator.generate_data(8)
+        generator.write_csv_sharded(path, 8, shards=2, processes=1)
+        generator.generate_data(4)
+        with open(path, newline='') as csvfile:
+            sharded = [int(row["customer_id"]) for row in csv.DictReader(csvfile)]
+        self.assertEqual(sorted(generator.data["customer_id"] + sharded), list(range(20)))
+        with self.assertRaises(ValueError):
+            generator.generate_data(1)
+
+    def test_char_pool(self):
+        """Test pooled characters come from the alphabet and survive refills."""
+        pool = CharPool(random.Random(1), "abc", size=16)
+        chunks = [pool.take(n) for n in (5, 11, 7, 16, 1)]
+        self.assertEqual([len(chunk) for chunk in chunks], [5, 11, 7, 16, 1])
+        text = ''.join(chunks) + pool.take(3000)
+        self.assertEqual(set(text), set("abc"))
+        for char in "abc":
+            self.assertAlmostEqual(text.count(char) / len(text), 1 / 3, delta=0.05)
+
+    def test_iso_dates(self):
+        """Test the date table covers every day of the configured range."""
+        dates = iso_dates()
+        self.assertEqual(dates[0], "2000-01-01")
+        self.assertEqual(dates[-1], "2023-12-31")
+        self.assertEqual(len(dates), (datetime(2023, 12, 31) - datetime(2000, 1, 1)).days + 1)
+
+    def test_alias_table(self):
+        """Test alias-method indexes follow their weights."""
+        table = AliasTable([5, 1, 0, 4])
+        rand = random.Random(3)
+        counts = [0] * 4
+        for _ in range(20000):
+            counts[table.index(rand.random())] += 1
+        self.assertEqual(counts[2], 0)
+        for count, weight in zip(counts, [0.5, 0.1, 0.0, 0.4]):
+            self.assertAlmostEqual(count / 20000, weight, delta=0.02)
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+    def test_zipf_sampler(self):
+        """Test zipf ranks follow 1 / k ** exponent within the range."""
+        sampler = ZipfSampler(10, 1.2)
+        rand = random.Random(4)
+        counts = [0] * 10
+        for _ in range(40000):
+            counts[sampler.rank(rand.random)] += 1
+        weights = [1 / (k + 1) ** 1.2 for k in range(10)]
+        for count, weight in zip(counts, weights):
+            self.assertAlmostEqual(count / 40000, weight / sum(weights), delta=0.01)
+
+    def test_distributions(self):
+        """Test each distribution stays in range and has the expected skew."""
+        columns = [
+            ColumnConfig(name="plan", data_type="string", distribution="weighted",
+                         choices=["free", "pro", "team"], weights=[8, 1, 1]),
+            ColumnConfig(name="hot", data_type="integer", min_value=1, max_value=10**6,
+                         distribution="zipf", exponent=1.1),
+            ColumnConfig(name="latency", data_type="float", min_value=0.0, max_value=500.0,
+                         distribution="exponential", mean=50.0),
+            ColumnConfig(name="age", data_type="integer", min_value=18, max_value=90,
+                         distribution="normal", mean=40, stddev=10),
+        ]
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = TestDataGenerator(columns, seed=9, backend=backend)
+            generator.generate_data(5000)
+            data = generator.data
+            self.assertAlmostEqual(data["plan"].count("free") / 5000, 0.8, delta=0.03)
+            self.assertTrue(all(1 <= v <= 10**6 for v in data["hot"]))
+            self.assertGreater(data["hot"].count(1), 5000 * 0.05)
+            self.assertTrue(all(0.0 <= v <= 500.0 for v in data["latency"]))
+            self.assertAlmostEqual(sum(data["latency"]) / 5000, 50.0, delta=5.0)
+            self.assertTrue(all(18 <= v <= 90 and isinstance(v, int) for v in data["age"]))
+            self.assertAlmostEqual(sum(data["age"]) / 5000, 40, delta=1.0)
+
+    def test_distribution_validation(self):
+        """Test unusable distribution settings fail at construction."""
+        invalid = [
+            ColumnConfig(name="c", data_type="integer", distribution="pareto"),
+            ColumnConfig(name="c", data_type="string", distribution="weighted"),
+            ColumnConfig(name="c", data_type="string", distribution="weighted",
+                         choices=["a", "b"], weights=[1]),
+            ColumnConfig(name="c", data_type="string", distribution="normal"),
+            ColumnConfig(name="c", data_type="email", distribution="zipf"),
+            ColumnConfig(name="c", data_type="integer", distribution="zipf", unique=True),
+            ColumnConfig(name="c", data_type="float", distribution="exponential", mean=-1.0),
+            ColumnConfig(name="c", data_type="float", min_value=0.0, max_value=1.0,
+                         distribution="normal", mean=50.0, stddev=1.0),
+            ColumnConfig(name="c", data_type="float", min_value=5.0, max_value=5.0,
+                         distribution="normal"),
+            ColumnConfig(name="c", data_type="integer", related_to="customers.id",
+                         distribution="weighted", choices=[1, 2]),
+        ]
+        for column in invalid:
+            with self.assertRaises(ValueError, msg=column):
+                TestDataGenerator([column], references={"customers.id": [1, 2, 3]})
+
+    def test_normal_tail_range(self):
+        """Test a normal range far in the tail stays truncated on both backends."""
+        column = ColumnConfig(name="tail", data_type="float", min_value=5.0, max_value=10.0,
+                              distribution="normal", mean=0.0, stddev=1.0)
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = TestDataGenerator([column], seed=4, backend=backend)
+            generator.generate_data(2000)
+            values = generator.data["tail"]
+            self.assertTrue(all(5.0 <= v <= 10.0 for v in values))
+            # The truncated mean is pdf(5) / (1 - cdf(5)), about 5.19
+            self.assertAlmostEqual(sum(values) / 2000, 5.19, delta=0.05)
+
+    def test_related_to_zipf(self):
+        """Test zipf related columns make the first parent keys hot."""
+        generator = TestDataGenerator([
+            ColumnConfig(name="customer_id", data_type="integer", related_to="customers.id",
+                         distribution="zipf", exponent=1.5),
+        ], seed=2, references={"customers.id": list(range(500, 1500))})
+        generator.generate_data(2000)
+        self.assertTrue(set(generator.data["customer_id"]) <= set(range(500, 1500)))
+        self.assertGreater(generator.data["customer_id"].count(500), 2000 * 0.3)
+
+    def test_unique_permutation(self):
+        """Test the permutation visits every value in its range exactly once."""
+        for size in (1, 2, 3, 17, 1000):
+            permutation = UniquePermutation(size, random.Random(size))
+            self.assertEqual(sorted(permutation.next() for _ in range(size)), list(range(size)))
+            with self.assertRaises(ValueError):
+                permutation.next()
+
+    def test_unique_columns(self):
+        """Test unique columns never repeat and fail once exhausted."""
+        columns = [
+            ColumnConfig(name="id", data_type="integer", min_value=1, max_value=3000, unique=True),
+            ColumnConfig(name="name", data_type="string", unique=True),
+            ColumnConfig(name="email", data_type="email", unique=True, null_probability=0.2),
+            ColumnConfig(name="phone", data_type="phone", unique=True),
+            ColumnConfig(name="score", data_type="float", max_value=100.0, unique=True),
+        ]
+        backends = ("python", "numpy") if numpy is not None else ("python",)
+        for backend in backends:
+            generator = TestDataGenerator(columns, seed=8, backend=backend)
+            generator.generate_data(1000)
+            generator.generate_data(2000)
+            self.assertEqual(sorted(generator.data["id"]), list(range(1, 3001)))
+            for name in ("name", "email", "phone", "score"):
+                values = [v for v in generator.data[name] if v is not None]
+                self.assertEqual(len(values), len(set(values)), name)
+            with self.assertRaises(ValueError):
+                generator.generate_data(1)
+
+    def test_unique_exhausted(self):
+        """Test unique columns with too few possible values raise ValueError."""
+        dates = TestDataGenerator([ColumnConfig(name="d", data_type="date", unique=True)], seed=1)
+        days = (datetime(2023, 12, 31) - datetime(2000, 1, 1)).days + 1
+        dates.generate_data(days)
+        self.assertEqual(len(set(dates.data["d"])), days)
+        with self.assertRaises(ValueError):
+            dates.generate_data(1)
+
+        fixed = TestDataGenerator([ColumnConfig(name="s", data_type="string",
+                                                pattern="same", unique=True)])
+        fixed.generate_data(1)
+        with self.assertRaises(ValueError):
+            fixed.generate_data(1)
+
+    def test_unique_sharded(self):
+        """Test unique columns stay unique across shards."""
+        directory = self.make_output_dir()
+        path = os.path.join(directory, 'users.csv')
+        generator = TestDataGenerator([
+            ColumnConfig(name="id", data_type="integer", min_value=0, max_value=899, unique=True),
+            ColumnConfig(name="email", data_type="email", unique=True),
+        ], seed=2)
+        generator.write_csv_sharded(path, 900, shards=3, processes=2)
+        with open(path, newline='') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        self.assertEqual(sorted(int(row["id"]) for row in rows), list(range(900)))
+        self.assertEqual(len({row["email"] for row in rows}), 900)
+
+    def test_unique_filter_sharded_then_sequential(self):
+        """Test values written by shards are not repeated by later rows."""
+        path = os.path.join(self.make_output_dir(), 'scores.csv')
+        # 0.00 to 0.10 holds 11 distinct values
+        generator = TestDataGenerator([
+            ColumnConfig(name="score", data_type="float", min_value=0.0, max_value=0.1, unique=True),
+        ], seed=3)
+        generator.write_csv_sharded(path, 6, shards=2, processes=1)
+        generator.generate_data(5)
+        with open(path, newline='') as csvfile:
+            sharded = [float(row["score"]) for row in csv.DictReader(csvfile)]
+        self.assertEqual(len(set(sharded + generator.data["score"])), 11)
+
+    def test_unique_filter_merge(self):
+        """Test merged shard filters reject what any shard accepted."""
+        unique = UniqueFilter()
+        unique.add("parent")
+        shards = [unique.for_shard(shard, 2) for shard in range(2)]
+        added = [value for value in map(str, range(200000)) if shards[int(value) % 2].add(value)]
+        unique.merge(shards)
+        self.assertFalse(unique.add("parent"))
+        self.assertFalse(any(unique.add(value) for value in added))
+        self.assertTrue(unique.add("new value"))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_backend(self):
+        """Test the vectorized backend produces valid, reproducible data."""
+        runs = []
+        for _ in range(2):
+            generator = TestDataGenerator(ALL_TYPES, seed=7, backend="numpy")
+            generator.generate_data(200)
+            generator.generate_data(100)
+            runs.append(generator.data)
+        self.assertEqual(runs[0], runs[1])
+        self.assert_valid_values(runs[0], 300)
+        self.assertIsInstance(runs[0]["id"][0], int)
+        self.assertIsInstance(runs[0]["score"][0], float)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_backend_null_values(self):
+        """Test the vectorized backend honours null_probability."""
+        columns = [ColumnConfig(name="nullable", data_type="date", null_probability=1.0)]
+        generator = TestDataGenerator(columns, seed=1, backend="numpy")
+        generator.generate_data(10)
+        self.assertEqual(generator.data["nullable"], [None] * 10)
+
+    def test_iter_batches(self):
+        """Test streaming generation yields fixed-size row batches."""
+        generator = TestDataGenerator(ALL_TYPES, seed=3)
+        batches = list(generator.iter_batches(25, batch_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertTrue(all(len(row) == len(ALL_TYPES) for batch in batches for row in batch))
+        # Nothing is kept in memory by the generator
+        self.assertTrue(all(values == [] for values in generator.data.values()))
+
+        # Row by row generation does not depend on the batch size
+        columns = list(zip(*[row for batch in batches for row in batch]))
+        expected = TestDataGenerator(ALL_TYPES, seed=3)
+        expected.generate_data(25)
+        self.assertEqual([list(values) for values in columns],
+                         [expected.data[col.name] for col in ALL_TYPES])
+
+    def test_write_csv_matches_save_to_csv(self):
+        """Test streaming CSV output matches generate_data plus save_to_csv."""
+        streamed_file = self.test_file + ".streamed"
+        self.addCleanup(lambda: os.path.exists(streamed_file) and os.remove(streamed_file))
+
+        TestDataGenerator(ALL_TYPES, seed=5).write_csv(streamed_file, 23, batch_size=4)
+        generator = TestDataGenerator(ALL_TYPES, seed=5)
+        generator.generate_data(23)
+        generator.save_to_csv(self.test_file)
+
+        with open(streamed_file, 'r') as f:
+            streamed = f.read()
+        with open(self.test_file, 'r') as f:
+            self.assertEqual(streamed, f.read())
+
+    def test_shard_sizes(self):
+        """Test rows are split evenly across shards."""
+        self.assertEqual(shard_sizes(10, 3), [4, 3, 3])
+        self.assertEqual(shard_sizes(2, 4), [1, 1, 0, 0])
+
+    def test_write_csv_sharded_is_deterministic(self):
+        """Test sharded output depends only on the seed and shard count."""
+        outputs = []
+        for processes in (1, 3):
+            generator = TestDataGenerator(ALL_TYPES, seed=11)
+            paths = generator.write_csv_sharded(self.test_file, 101, shards=4, processes=processes)
+            self.assertEqual(paths, [self.test_file])
+            with open(self.test_file, 'rb') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertFalse(any(name.startswith(self.test_file + ".part") for name in os.listdir('.')))
+
+        with open(self.test_file, 'r') as csvfile:
+            rows = list(csv.reader(csvfile))
+        self.assertEqual(rows[0], [col.name for col in ALL_TYPES])
+        self.assertEqual(len(rows), 102)
+
+    def test_write_csv_sharded_continues(self):
+        """Test a second sharded run writes new rows, like a second write_csv."""
+        generator = TestDataGenerator(ALL_TYPES, seed=11)
+        outputs = []
+        for _ in range(2):
+            generator.write_csv_sharded(self.test_file, 5, shards=2, processes=1)
+            with open(self.test_file, 'rb') as f:
+                outputs.append(f.read())
+        self.assertNotEqual(outputs[0], outputs[1])
+        self.assertEqual(generator.next_row, 10)
+
+    def test_write_csv_sharded_without_merge(self):
+        """Test unmerged shards are separate CSV files with headers."""
+        generator = TestDataGenerator(self.columns, seed=2)
+        paths = generator.write_csv_sharded(self.test_file, 10, shards=3, processes=2, merge=False)
+        for path in paths:
+            self.addCleanup(os.remove, path)
+
+        row_counts = []
+        for path in paths:
+            with open(path, 'r') as csvfile:
+                rows = list(csv.reader(csvfile))
+            self.assertEqual(rows[0], [col.name for col in self.columns])
+            row_counts.append(len(rows) - 1)
+        self.assertEqual(row_counts, [4, 3, 3])
+
+    def make_output_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return directory
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_save_to_npy(self):
+        """Test per-column .npy files load back with NumPy."""
+        generator = TestDataGenerator(ALL_TYPES, seed=4)
+        generator.generate_data(40)
+        directory = self.make_output_dir()
+        paths = generator.save_to_npy(directory)
+
+        # Only the nullable phone column gets a mask
+        self.assertEqual(len(paths), len(ALL_TYPES) + 1)
+        data = generator.data
+        self.assertEqual(numpy.load(os.path.join(directory, 'id.npy')).tolist(), data["id"])
+        self.assertEqual(numpy.load(os.path.join(directory, 'score.npy')).tolist(), data["score"])
+        self.assertEqual(numpy.load(os.path.join(directory, 'name.npy')).tolist(), data["name"])
+        joined = numpy.load(os.path.join(directory, 'joined.npy'))
+        self.assertEqual(joined.dtype, numpy.dtype('datetime64[D]'))
+        self.assertEqual(joined.astype(str).tolist(), data["joined"])
+
+        phones = numpy.load(os.path.join(directory, 'phone.npy')).tolist()
+        mask = numpy.load(os.path.join(directory, 'phone.mask.npy')).tolist()
+        self.assertEqual(mask, [v is None for v in data["phone"]])
+        self.assertEqual([None if null else v for v, null in zip(phones, mask)], data["phone"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_save_to_arrow_and_parquet(self):
+        """Test Arrow IPC and Parquet files round-trip the generated data."""
+        import pyarrow.parquet
+        generator = TestDataGenerator(ALL_TYPES, seed=6)
+        generator.generate_data(40)
+        directory = self.make_output_dir()
+        arrow_path = os.path.join(directory, 'data.arrow')
+        parquet_path = os.path.join(directory, 'data.parquet')
+        generator.save_to_arrow(arrow_path)
+        generator.save_to_parquet(parquet_path)
+
+        with pyarrow.OSFile(arrow_path, 'rb') as source:
+            arrow_table = pyarrow.ipc.open_file(source).read_all()
+        parquet_table = pyarrow.parquet.read_table(parquet_path)
+        for table in (arrow_table, parquet_table):
+            self.assertEqual(table.column_names, [col.name for col in ALL_TYPES])
+            self.assertEqual(table.column("id").to_pylist(), generator.data["id"])
+            self.assertEqual(table.column("phone").to_pylist(), generator.data["phone"])
+            self.assertEqual([d.isoformat() for d in table.column("joined").to_pylist()],
+                             generator.data["joined"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_to_arrow_dictionary(self):
+        """Test only low-cardinality text columns are dictionary encoded."""
+        generator = TestDataGenerator(ALL_TYPES, seed=6)
+        generator.generate_data(40)
+        table = generator.to_arrow(dictionary=True)
+        self.assertTrue(pyarrow.types.is_dictionary(table.schema.field("label").type))
+        self.assertFalse(pyarrow.types.is_dictionary(table.schema.field("name").type))
+        self.assertEqual(table.column("label").to_pylist(), generator.data["label"])
+
+    def test_save_to_sqlite(self):
+        """Test rows, column types and indexes of a SQLite table."""
+        columns = ALL_TYPES + [ColumnConfig(name="user_id", data_type="integer", unique=True)]
+        generator = TestDataGenerator(columns, seed=10)
+        generator.generate_data(57)
+        path = os.path.join(self.make_output_dir(), 'data.db')
+        generator.save_to_sqlite(path, table='users', indexes=["email", "user_id"], batch_size=10)
+
+        connection = sqlite3.connect(path)
+        self.addCleanup(connection.close)
+        rows = connection.execute('SELECT * FROM users').fetchall()
+        self.assertEqual(rows, list(zip(*(generator.data[col.name] for col in columns))))
+        types = {row[1]: row[2] for row in connection.execute('PRAGMA table_info(users)')}
+        self.assertEqual((types["id"], types["score"], types["joined"]), ("INTEGER", "REAL", "TEXT"))
+        self.assertEqual(connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        indexes = {row[1]: row[2] for row in connection.execute('PRAGMA index_list(users)')}
+        self.assertEqual(indexes, {"users_email_idx": 0, "users_user_id_idx": 1})
+
+    def test_write_sqlite(self):
+        """Test streamed SQLite output replaces the table and matches generate_data."""
+        path = os.path.join(self.make_output_dir(), 'data.db')
+        TestDataGenerator(ALL_TYPES, seed=11).write_sqlite(path, 5)
+        TestDataGenerator(ALL_TYPES, seed=11).write_sqlite(path, 23, batch_size=4)
+        generator = TestDataGenerator(ALL_TYPES, seed=11)
+        generator.generate_data(23)
+
+        connection = sqlite3.connect(path)
+        self.addCleanup(connection.close)
+        rows = connection.execute('SELECT * FROM data').fetchall()
+        self.assertEqual(rows, list(zip(*(generator.data[col.name] for col in ALL_TYPES))))
+        with self.assertRaises(ValueError):
+            generator.save_to_sqlite(path, indexes=["missing"])
+
+    def expected_rows(self, seed, num_rows):
+        generator = TestDataGenerator(ALL_TYPES, seed=seed)
+        generator.generate_data(num_rows)
+        return [[str(v) if v is not None else '' for v in row]
+                for row in zip(*(generator.data[col.name] for col in ALL_TYPES))]
+
+    def test_import_does_not_load_streaming_modules(self):
+        # Run in a fresh interpreter so other tests' imports do not leak in
+        script = (
+            "import sys\n"
+            "import src.test_data_generator\n"
+            "print(sorted(m for m in ('asyncio', 'urllib.parse') if m in sys.modules))\n"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=root,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_stream_rate(self):
+        """Test streamed batches keep to the target rate and match generate_data."""
+        async def consume():
+            stream = TestDataGenerator(ALL_TYPES, seed=12).stream(2000, batch_size=50, num_rows=400)
+            return [row for batch in [b async for b in stream] for row in batch], stream.stats
+
+        rows, stats = asyncio.run(consume())
+        self.assertEqual([[str(v) if v is not None else '' for v in row] for row in rows],
+                         self.expected_rows(12, 400))
+        self.assertEqual((stats.rows, stats.batches), (400, 8))
+        # The last batch is due 350 rows in, at 0.175s
+        self.assertGreaterEqual(stats.elapsed, 0.17)
+        self.assertLess(stats.throughput, 2000 * 400 / 350 * 1.01)
+
+    def test_stream_lag(self):
+        """Test a slow consumer shows up as lag instead of a burst."""
+        async def consume():
+            stream = TestDataGenerator(ALL_TYPES, seed=12).stream(10000, batch_size=10, num_rows=50)
+            async for _ in stream:
+                await asyncio.sleep(0.02)
+            return stream.stats
+
+        stats = asyncio.run(consume())
+        self.assertGreater(stats.max_lag, 0.05)
+        self.assertLess(stats.throughput, 1000)
+
+    def test_socket_sink_tcp(self):
+        """Test rows streamed to a TCP server arrive as CSV with a header."""
+        async def run():
+            received = bytearray()
+            done = asyncio.Event()
+
+            async def handle(reader, writer):
+                received.extend(await reader.read())
+                writer.close()
+                done.set()
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            stream = TestDataGenerator(ALL_TYPES, seed=13).stream(5000, batch_size=25, num_rows=60)
+            await stream.pipe(SocketSink('127.0.0.1', port))
+            await done.wait()
+            server.close()
+            await server.wait_closed()
+            return list(csv.reader(io.StringIO(received.decode())))
+
+        rows = asyncio.run(run())
+        self.assertEqual(rows[0], [col.name for col in ALL_TYPES])
+        self.assertEqual(rows[1:], self.expected_rows(13, 60))
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets are not available")
+    def test_socket_sink_unix(self):
+        """Test rows can be streamed to a Unix domain socket."""
+        path = os.path.join(self.make_output_dir(), 'rows.sock')
+
+        async def run():
+            received = bytearray()
+            done = asyncio.Event()
+
+            async def handle(reader, writer):
+                received.extend(await reader.read())
+                writer.close()
+                done.set()
+
+            server = await asyncio.start_unix_server(handle, path)
+            stream = TestDataGenerator(ALL_TYPES, seed=14).stream(5000, num_rows=30)
+            await stream.pipe(SocketSink(path=path))
+            await done.wait()
+            server.close()
+            await server.wait_closed()
+            return list(csv.reader(io.StringIO(received.decode())))
+
+        rows = asyncio.run(run())
+        self.assertEqual(rows[1:], self.expected_rows(14, 30))
+
+    def test_http_sink(self):
+        """Test each batch is POSTed to an HTTP server as a CSV body."""
+        bodies = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                bodies.append(self.rfile.read(int(self.headers['Content-Length'])).decode())
+                if self.path == '/garbage':
+                    self.wfile.write(b'garbage\r\n\r\n')
+                    return
+                status = 500 if self.path == '/fail' else 200
+                self.send_response(status)
+                if self.path == '/chunked':
+                    # Keep-alive replies without a length never reach EOF
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    self.wfile.write(b'2;ext=1\r\nok\r\n0\r\n\r\n')
+                    return
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        stream = TestDataGenerator(ALL_TYPES, seed=15).stream(5000, batch_size=20, num_rows=50)
+        stats = asyncio.run(stream.pipe(HttpSink(url + '/rows')))
+        self.assertEqual(stats.batches, 3)
+        batches = [list(csv.reader(io.StringIO(body))) for body in bodies]
+        self.assertTrue(all(batch[0] == [col.name for col in ALL_TYPES] for batch in batches))
+        self.assertEqual([row for batch in batches for row in batch[1:]], self.expected_rows(15, 50))
+
+        bodies.clear()
+        stream = TestDataGenerator(ALL_TYPES, seed=15).stream(5000, batch_size=20, num_rows=50)
+        stats = asyncio.run(asyncio.wait_for(stream.pipe(HttpSink(url + '/chunked')), 5))
+        self.assertEqual((stats.batches, len(bodies)), (3, 3))
+
+        for path in ('/fail', '/garbage'):
+            with self.assertRaises(ConnectionError):
+                asyncio.run(TestDataGenerator(ALL_TYPES).stream(100, num_rows=5)
+                            .pipe(HttpSink(url + path)))
+
+    def counter_columns(self):
+        return ALL_TYPES + [
+            ColumnConfig(name="user_id", data_type="integer", min_value=1, max_value=10**6,
+                         unique=True),
+            ColumnConfig(name="plan", data_type="string", distribution="weighted",
+                         choices=["free", "pro"], weights=[3, 1]),
+            ColumnConfig(name="hot", data_type="integer", distribution="zipf"),
+        ]
+
+    def test_counter_based_random_access(self):
+        """Test any slice of a counter-based dataset can be generated on its own."""
+        generator = TestDataGenerator(self.counter_columns(), seed=16, counter_based=True)
+        for batch in (7, 120, 173):
+            generator.generate_data(batch)
+        self.assertEqual(generator.next_row, 300)
+        expected = list(zip(*(generator.data[col.name] for col in generator.columns)))
+
+        fresh = TestDataGenerator(self.counter_columns(), seed=16, counter_based=True)
+        self.assertEqual(fresh.rows(250, 260), expected[250:260])
+        self.assertEqual(fresh.rows(0, 300), expected)
+        self.assertEqual(fresh.next_row, 0)
+        self.assertEqual(len({row[-3] for row in expected}), 300)
+        self.assert_valid_values(generator.data, 300)
+
+        other = TestDataGenerator(self.counter_columns(), seed=17, counter_based=True)
+        self.assertNotEqual(other.rows(0, 10), expected[:10])
+
+    def test_virtual_dataset(self):
+        """Test a virtual dataset materializes rows only when read."""
+        generator = TestDataGenerator(ALL_TYPES, seed=18, counter_based=True)
+        dataset = generator.virtual(10**12)
+        self.assertEqual(len(dataset), 10**12)
+        self.assertEqual(dataset[5 * 10**11], generator.rows(5 * 10**11, 5 * 10**11 + 1)[0])
+        self.assertEqual(dataset[-1], dataset[10**12 - 1])
+        self.assertEqual(dataset[10:20], generator.rows(10, 20))
+        self.assertEqual(dataset[10:20:3], generator.rows(10, 20)[::3])
+        with self.assertRaises(IndexError):
+            dataset[10**12]
+        self.assertEqual(list(generator.virtual(25)), generator.rows(0, 25))
+
+        # Unique columns still run out past the end of their range
+        unique = TestDataGenerator(self.counter_columns(), seed=18, counter_based=True)
+        self.assertEqual(len(unique.virtual(10**6)[999999]), len(unique.columns))
+        with self.assertRaises(ValueError):
+            unique.virtual(10**6 + 1)[10**6]
+
+    def test_counter_based_sharded_matches_write_csv(self):
+        """Test counter-based shards reproduce the single-process file exactly."""
+        directory = self.make_output_dir()
+        single, sharded = (os.path.join(directory, name) for name in ('single.csv', 'sharded.csv'))
+        TestDataGenerator(self.counter_columns(), seed=19, counter_based=True).write_csv(single, 90)
+        TestDataGenerator(self.counter_columns(), seed=19, counter_based=True).write_csv_sharded(
+            sharded, 90, shards=4, processes=2)
+        with open(single, 'rb') as a, open(sharded, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_counter_based_unsupported(self):
+        """Test settings that need sequential state are rejected in counter-based mode."""
+        with self.assertRaises(ValueError):
+            TestDataGenerator(ALL_TYPES, counter_based=True, backend="numpy")
+        with self.assertRaises(ValueError):
+            TestDataGenerator([ColumnConfig(name="e", data_type="email", unique=True)],
+                              counter_based=True)
+        with self.assertRaises(ValueError):
+            TestDataGenerator(ALL_TYPES).rows(0, 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -2,15 +2,49 @@ import unittest
 import os
 import tempfile
 import shutil
+import re
+import sys
+import subprocess
 import json
+import threading
+import multiprocessing
 import yaml
+from unittest import mock
 from src.tree_writer import (
     generate_directory_structure,
+    generate_directory_structure_parallel,
+    generate_directory_table,
+    iter_directory_structure,
+    iter_directory_structure_cached,
+    scan_directory,
+    snapshot_path,
+    evict_snapshots,
+    DirectoryWatcher,
+    DirectoryTable,
     describe_directory_in_natural_language,
     is_hidden,
-    save_to_file
+    save_to_file,
+    save_to_pdf,
+    save_all_formats
 )
 
+def walk_directory_structure(startpath, max_depth):
+    """Reference os.walk implementation the scanners must agree with."""
+    structure = []
+    start_level = startpath.count(os.sep)
+    for root, dirs, files in os.walk(startpath):
+        dirs[:] = [d for d in dirs if not is_hidden(d)]
+        files = [f for f in files if not is_hidden(f)]
+        level = root.count(os.sep) - start_level
+        if max_depth != -1 and level > max_depth:
+            continue
+        if is_hidden(os.path.basename(root)):
+            continue
+        structure.append({'dir': os.path.basename(root), 'level': level,
+                          'files': files, 'subdirs': dirs})
+    return structure
+
+
 class TestTreeWriter(unittest.TestCase):
     def setUp(self):
         # Create a temporary directory structure for testing
@@ -63,6 +97,71 @@ class TestTreeWriter(unittest.TestCase):
         max_level = max(item['level'] for item in structure)
         self.assertEqual(max_level, 1)
 
+    def test_generate_directory_structure_matches_os_walk(self):
+        os.makedirs(os.path.join(self.test_dir, 'dir2', 'subdir', 'deep', 'deeper'))
+        self.create_test_file(os.path.join(self.test_dir, 'dir2', 'subdir', 'deep', 'file5.txt'))
+        for depth in (-1, 0, 1, 2, 3):
+            self.assertEqual(generate_directory_structure(self.test_dir, depth),
+                             walk_directory_structure(self.test_dir, depth))
+
+    def test_generate_directory_structure_prunes_at_depth(self):
+        os.makedirs(os.path.join(self.test_dir, 'dir2', 'subdir', 'deep', 'deeper'))
+        real_scandir = os.scandir
+        with mock.patch('src.tree_writer.os.scandir', side_effect=real_scandir) as scandir:
+            structure = generate_directory_structure(self.test_dir, 1)
+
+        # Only the root and its two visible children are listed
+        self.assertEqual(scandir.call_count, 3)
+        self.assertEqual(len(structure), 3)
+
+    def test_parallel_structure_matches_serial(self):
+        # Build a wider tree so several workers get to steal work
+        for i in range(6):
+            for j in range(4):
+                path = os.path.join(self.test_dir, f'wide{i}', f'sub{j}', 'leaf')
+                os.makedirs(path)
+                self.create_test_file(os.path.join(path, f'file{i}{j}.txt'))
+        for depth in (-1, 0, 1, 2):
+            serial = generate_directory_structure(self.test_dir, depth)
+            for workers in (1, 2, 8):
+                self.assertEqual(
+                    generate_directory_structure_parallel(self.test_dir, depth, workers),
+                    serial)
+
+    def test_directory_table_matches_structure(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        for workers in (1, 4):
+            table = generate_directory_table(self.test_dir, -1, workers)
+            self.assertEqual(len(table), len(structure))
+            self.assertEqual(list(table), structure)
+            self.assertEqual(table[-1], structure[-1])
+
+    def test_directory_table_parents_and_interning(self):
+        structure = [
+            {'dir': 'root', 'level': 0, 'files': ['README.md'], 'subdirs': ['a', 'b']},
+            {'dir': 'a', 'level': 1, 'files': ['README.md', 'x.py'], 'subdirs': ['c']},
+            {'dir': 'c', 'level': 2, 'files': [], 'subdirs': []},
+            {'dir': 'b', 'level': 1, 'files': ['README.md'], 'subdirs': []}
+        ]
+        table = DirectoryTable.from_entries(structure)
+
+        self.assertEqual(list(table.parents), [-1, 0, 1, 0])
+        # Repeated names are stored once in the pool
+        self.assertEqual(table.names.count('README.md'), 1)
+        self.assertEqual(list(table), structure)
+        with self.assertRaises(IndexError):
+            table[len(structure)]
+
+    def test_save_to_file_accepts_directory_table(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        table = generate_directory_table(self.test_dir, -1)
+        output_file = os.path.join(self.test_dir, 'output')
+
+        save_to_file(table, output_file, 'json')
+        with open(output_file + '.json', 'r') as f:
+            data = json.load(f)
+        self.assertEqual(data, structure)
+
     def test_describe_directory_in_natural_language(self):
         structure = generate_directory_structure(self.test_dir, -1)
         description = describe_directory_in_natural_language(structure)
@@ -124,5 +223,252 @@ class TestTreeWriter(unittest.TestCase):
             content = f.read()
         self.assertGreater(len(content), 0)
 
+    def read_output(self, path):
+        with open(path, 'r') as f:
+            return f.read()
+
+    def test_streamed_formats_match_materialized_output(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        output_file = os.path.join(out_dir, 'output')
+
+        for fmt in ('txt', 'natural', 'json', 'yaml', 'html'):
+            save_to_file(iter(structure), output_file, fmt)
+
+        self.assertEqual(self.read_output(output_file + '_t.txt'),
+                         '\n'.join(str(item) for item in structure))
+        self.assertEqual(self.read_output(output_file + '_n.txt'),
+                         describe_directory_in_natural_language(structure))
+        self.assertEqual(self.read_output(output_file + '.json'),
+                         json.dumps(structure, indent=4))
+        self.assertEqual(self.read_output(output_file + '.yaml'),
+                         yaml.dump(structure))
+        self.assertEqual(self.read_output(output_file + '.html'),
+                         '<html><body><pre>' + '\n'.join(str(item) for item in structure)
+                         + '</pre></body></html>')
+
+    def test_streamed_formats_handle_empty_structure(self):
+        output_file = os.path.join(self.test_dir, 'output')
+        save_to_file(iter([]), output_file, 'json')
+        save_to_file(iter([]), output_file, 'yaml')
+        self.assertEqual(json.loads(self.read_output(output_file + '.json')), [])
+        self.assertEqual(yaml.safe_load(self.read_output(output_file + '.yaml')), [])
+
+    def test_streaming_output_excluded_from_walk(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        output_file = os.path.join(self.test_dir, 'dir2', 'subdir', 'output')
+
+        # The tree is still being walked while the output is written into it
+        save_to_file(iter_directory_structure(self.test_dir, -1), output_file, 'json')
+
+        with open(output_file + '.json', 'r') as f:
+            self.assertEqual(json.load(f), structure)
+        # The temporary file has been renamed into place
+        self.assertEqual(sorted(os.listdir(os.path.join(self.test_dir, 'dir2', 'subdir'))),
+                         ['file4.txt', 'output.json'])
+
+    def test_save_all_formats_single_pass(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        expected_base = os.path.join(out_dir, 'expected')
+        for fmt in ('txt', 'natural', 'html', 'json', 'yaml'):
+            save_to_file(structure, expected_base, fmt)
+
+        cwd = os.getcwd()
+        os.chdir(out_dir)
+        self.addCleanup(os.chdir, cwd)
+        for processes in (False, True):
+            consumed = []
+            def once():
+                for item in structure:
+                    consumed.append(item)
+                    yield item
+            save_all_formats(once(), 'tree', processes=processes)
+
+            self.assertEqual(len(consumed), len(structure))
+            for suffix in ('_t.txt', '_n.txt', '.html', '.json', '.yaml'):
+                self.assertEqual(self.read_output(os.path.join('trees', 'tree' + suffix)),
+                                 self.read_output(expected_base + suffix))
+            self.assertTrue(os.path.exists(os.path.join('trees', 'tree.pdf')))
+
+    def test_save_all_formats_forks_before_starting_threads(self):
+        structure = generate_directory_structure(self.test_dir, -1)
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        cwd = os.getcwd()
+        os.chdir(out_dir)
+        self.addCleanup(os.chdir, cwd)
+
+        started = []
+        thread_start = threading.Thread.start
+        process_start = multiprocessing.Process.start
+        def record_thread(worker):
+            started.append('thread')
+            thread_start(worker)
+        def record_process(worker):
+            started.append('process')
+            process_start(worker)
+        with mock.patch.object(threading.Thread, 'start', autospec=True, side_effect=record_thread), \
+                mock.patch.object(multiprocessing.Process, 'start', autospec=True,
+                                  side_effect=record_process):
+            save_all_formats(iter(structure), 'tree', processes=True)
+
+        # The sinks' own starts come first; queue feeder threads start later
+        self.assertEqual(started[:2], ['process', 'process'])
+        self.assertNotIn('process', started[2:])
+
+    def count_pdf_pages(self, path):
+        with open(path, 'rb') as f:
+            return len(re.findall(rb'/Type /Page\b(?!s)', f.read()))
+
+    def test_save_to_pdf_paginates(self):
+        output_file = os.path.join(self.test_dir, 'output')
+        structure = [{'dir': 'root', 'level': 0, 'subdirs': [],
+                      'files': [f'file{i}.txt' for i in range(199)]}]
+
+        # 200 lines at 53 lines per page
+        save_to_pdf(structure, output_file)
+        self.assertEqual(self.count_pdf_pages(output_file + '.pdf'), 4)
+
+        # A page that is exactly full does not leave a blank page behind
+        save_to_pdf([dict(structure[0], files=structure[0]['files'][:52])], output_file)
+        self.assertEqual(self.count_pdf_pages(output_file + '.pdf'), 1)
+
+        save_to_pdf([], output_file)
+        self.assertEqual(self.count_pdf_pages(output_file + '.pdf'), 1)
+
+    def test_txt_and_json_do_not_import_format_backends(self):
+        # Run in a fresh interpreter so other tests' imports do not leak in
+        script = (
+            "import sys\n"
+            "from src.tree_writer import generate_directory_structure, save_to_file\n"
+            f"structure = generate_directory_structure({self.test_dir!r}, -1)\n"
+            f"save_to_file(structure, {os.path.join(self.test_dir, 'out')!r}, 'txt')\n"
+            f"save_to_file(structure, {os.path.join(self.test_dir, 'out')!r}, 'json')\n"
+            "print(sorted(m for m in ('reportlab', 'yaml', 'jinja2') if m in sys.modules))\n"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=root,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_plain_run_does_not_import_cache_or_watch_modules(self):
+        # hashlib backs --cache and select/struct back --watch
+        script = (
+            "import sys\n"
+            "import src.tree_writer\n"
+            "print(sorted(m for m in ('hashlib', 'select', 'struct') if m in sys.modules))\n"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=root,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def age_tree(self, root, seconds=3600):
+        # Snapshots distrust directories modified right before the last scan
+        past = os.stat(root).st_mtime - seconds
+        for dirpath, _, _ in os.walk(root):
+            os.utime(dirpath, (past, past))
+
+    def test_cached_walk_rescans_only_changed_directories(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.age_tree(self.test_dir)
+        expected = generate_directory_structure(self.test_dir, -1)
+
+        self.assertEqual(list(iter_directory_structure_cached(self.test_dir, -1, cache_dir)), expected)
+        self.assertTrue(os.path.exists(snapshot_path(cache_dir, self.test_dir)))
+
+        # Warm run on an unchanged tree: no directory is listed again
+        with mock.patch('src.tree_writer.scan_directory') as scan:
+            warm = list(iter_directory_structure_cached(self.test_dir, -1, cache_dir))
+            scan.assert_not_called()
+        self.assertEqual(warm, expected)
+
+        # Adding a file changes only its directory's mtime
+        new_file = os.path.join(self.test_dir, 'dir2', 'new.txt')
+        self.create_test_file(new_file)
+        os.utime(os.path.dirname(new_file), (0, os.stat(self.test_dir).st_mtime + 60))
+        with mock.patch('src.tree_writer.scan_directory', side_effect=scan_directory) as scan:
+            updated = list(iter_directory_structure_cached(self.test_dir, -1, cache_dir))
+        self.assertEqual([c.args[0] for c in scan.call_args_list],
+                         [os.path.join(self.test_dir, 'dir2')])
+        self.assertEqual(updated, generate_directory_structure(self.test_dir, -1))
+
+    def test_snapshot_eviction_is_least_recently_used(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        roots = []
+        for name in ('a', 'b', 'c'):
+            root = os.path.join(self.test_dir, 'roots', name)
+            os.makedirs(root)
+            roots.append(root)
+            list(iter_directory_structure_cached(root, -1, cache_dir))
+        paths = [snapshot_path(cache_dir, root) for root in roots]
+        for age, path in zip((300, 100, 200), paths):
+            os.utime(path, (0, os.stat(path).st_mtime - age))
+
+        # Room for two snapshots: the least recently used one ('a') goes
+        limit = sum(os.path.getsize(path) for path in paths[1:])
+        evict_snapshots(cache_dir, limit, keep=paths[2])
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is Linux only')
+    def test_directory_watcher_tracks_changes(self):
+        watcher = DirectoryWatcher(self.test_dir, -1)
+        self.addCleanup(watcher.close)
+        self.assertEqual(list(watcher.structure()),
+                         generate_directory_structure(self.test_dir, -1))
+
+        # New directories are picked up and watched themselves
+        os.makedirs(os.path.join(self.test_dir, 'dir3', 'nested'))
+        self.create_test_file(os.path.join(self.test_dir, 'dir1', 'file5.txt'))
+        self.assertTrue(watcher.apply(watcher.poll(1.0, 0.05)))
+        self.create_test_file(os.path.join(self.test_dir, 'dir3', 'nested', 'file6.txt'))
+        self.assertTrue(watcher.apply(watcher.poll(1.0, 0.05)))
+        self.assertEqual(list(watcher.structure()),
+                         generate_directory_structure(self.test_dir, -1))
+
+        # Renames and deletions drop the old subtree
+        os.rename(os.path.join(self.test_dir, 'dir2'), os.path.join(self.test_dir, 'moved'))
+        shutil.rmtree(os.path.join(self.test_dir, 'dir3'))
+        self.assertTrue(watcher.apply(watcher.poll(1.0, 0.05)))
+        self.assertEqual(list(watcher.structure()),
+                         generate_directory_structure(self.test_dir, -1))
+        self.assertNotIn(os.path.join(self.test_dir, 'dir3', 'nested'), watcher.listings)
+
+        # Hidden files generate no work
+        self.create_test_file(os.path.join(self.test_dir, '.another_hidden'))
+        self.assertEqual(watcher.poll(0.2, 0.05), set())
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is Linux only')
+    def test_directory_watcher_keeps_watch_of_moved_directory(self):
+        os.makedirs(os.path.join(self.test_dir, 'src', 'deep', 'x', 'child'))
+        os.makedirs(os.path.join(self.test_dir, 'dst'))
+        watcher = DirectoryWatcher(self.test_dir, -1)
+        self.addCleanup(watcher.close)
+
+        # dst is refreshed before src/deep, re-adding x under its existing wd
+        os.rename(os.path.join(self.test_dir, 'src', 'deep', 'x'),
+                  os.path.join(self.test_dir, 'dst', 'x'))
+        self.assertTrue(watcher.apply(watcher.poll(1.0, 0.05)))
+        self.create_test_file(os.path.join(self.test_dir, 'dst', 'x', 'child', 'new.txt'))
+        self.assertEqual(watcher.poll(1.0, 0.05), {os.path.join(self.test_dir, 'dst', 'x', 'child')})
+        watcher.apply({os.path.join(self.test_dir, 'dst', 'x', 'child')})
+        self.assertEqual(list(watcher.structure()),
+                         generate_directory_structure(self.test_dir, -1))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is Linux only')
+    def test_directory_watcher_lists_unwatchable_directories(self):
+        with mock.patch('src.tree_writer.Inotify.add_watch',
+                        side_effect=OSError(28, 'No space left on device')):
+            with self.assertWarnsRegex(RuntimeWarning, 'not watched'):
+                watcher = DirectoryWatcher(self.test_dir, -1)
+        self.addCleanup(watcher.close)
+        self.assertEqual(list(watcher.structure()),
+                         generate_directory_structure(self.test_dir, -1))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file